@@ -0,0 +1,131 @@
+import sys
+import json
+
+# --- Booking Analytics ---
+# Trip counts, cancellations and revenue, grouped by route, vehicle type and
+# payment method. Totals are updated on every booking event, so reading them
+# never rescans the booking history. Historical data is folded in with one
+# pass over the bookings.
+
+TRIPS, CANCELLED, REVENUE = 0, 1, 2
+
+
+class BookingAnalytics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.totals = [0, 0, 0]     # [trips, cancelled, revenue]
+        self.by_route = {}          # (start, end) -> [trips, cancelled, revenue]
+        self.by_vehicle = {}        # vehicle_type -> [trips, cancelled, revenue]
+        self.by_payment = {}        # payment_method -> [trips, cancelled, revenue]
+
+    @classmethod
+    def from_bookings(cls, bookings):
+        """Builds the aggregates from existing bookings (or booking dicts) in a single pass."""
+        analytics = cls()
+        for booking in bookings:
+            if isinstance(booking, dict):
+                booking = _Row(booking)
+            analytics.record_booking(booking)
+            if booking.status == "cancelled":
+                analytics.record_cancel(booking)
+        return analytics
+
+    def merge(self, other):
+        """Adds another set of aggregates (e.g. archived bookings) into this one."""
+        for mine, theirs in ((self.by_route, other.by_route), (self.by_vehicle, other.by_vehicle),
+                             (self.by_payment, other.by_payment)):
+            for key, group in theirs.items():
+                target = mine.setdefault(key, [0, 0, 0])
+                for i in (TRIPS, CANCELLED, REVENUE):
+                    target[i] += group[i]
+        for i in (TRIPS, CANCELLED, REVENUE):
+            self.totals[i] += other.totals[i]
+
+    def to_state(self):
+        """JSON-safe copy of the aggregates (route keys become [start, end] lists)."""
+        return {
+            "totals": self.totals,
+            "by_route": [[start, end, g] for (start, end), g in self.by_route.items()],
+            "by_vehicle": self.by_vehicle,
+            "by_payment": self.by_payment,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        analytics = cls()
+        if state:
+            analytics.totals = list(state["totals"])
+            analytics.by_route = {(start, end): list(g) for start, end, g in state["by_route"]}
+            analytics.by_vehicle = {k: list(g) for k, g in state["by_vehicle"].items()}
+            analytics.by_payment = {k: list(g) for k, g in state["by_payment"].items()}
+        return analytics
+
+    def _groups(self, booking):
+        return (
+            self.totals,
+            self.by_route.setdefault((booking.start, booking.end), [0, 0, 0]),
+            self.by_vehicle.setdefault(booking.vehicle_type, [0, 0, 0]),
+            self.by_payment.setdefault(booking.payment_method, [0, 0, 0]),
+        )
+
+    def record_booking(self, booking):
+        for group in self._groups(booking):
+            group[TRIPS] += 1
+            group[REVENUE] += booking.cost
+
+    def record_cancel(self, booking):
+        """A cancelled trip still counts as a trip, but its fare is not revenue."""
+        for group in self._groups(booking):
+            group[CANCELLED] += 1
+            group[REVENUE] -= booking.cost
+
+    def cancellation_rate(self, group=None):
+        group = group or self.totals
+        return group[CANCELLED] / group[TRIPS] if group[TRIPS] else 0.0
+
+    def top_routes(self, n=5):
+        """[((start, end), trips, revenue), ...] by revenue."""
+        rows = [(route, g[TRIPS], g[REVENUE]) for route, g in self.by_route.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:n]
+
+    def summary(self):
+        def table(groups):
+            return {
+                str(key) if not isinstance(key, tuple) else f"{key[0]} → {key[1]}": {
+                    "trips": g[TRIPS],
+                    "cancelled": g[CANCELLED],
+                    "revenue": g[REVENUE],
+                    "cancellation_rate": self.cancellation_rate(g),
+                }
+                for key, g in groups.items()
+            }
+        return {
+            "trips": self.totals[TRIPS],
+            "cancelled": self.totals[CANCELLED],
+            "revenue": self.totals[REVENUE],
+            "cancellation_rate": self.cancellation_rate(),
+            "by_route": table(self.by_route),
+            "by_vehicle": table(self.by_vehicle),
+            "by_payment": table(self.by_payment),
+        }
+
+
+class _Row:
+    """Attribute access for booking dicts, so raw JSON can be aggregated without Booking objects."""
+    def __init__(self, data):
+        self.start = data.get("start")
+        self.end = data.get("end")
+        self.vehicle_type = data.get("vehicle_type")
+        self.payment_method = data.get("payment_method", "Cash")
+        self.cost = data.get("cost", 0)
+        self.status = data.get("status", "active")
+
+
+if __name__ == "__main__":
+    # Usage: python analytics.py [bookings.json]
+    path = sys.argv[1] if len(sys.argv) > 1 else "bookings.json"
+    with open(path, "r") as f:
+        print(json.dumps(BookingAnalytics.from_bookings(json.load(f)).summary(), indent=2, ensure_ascii=False))
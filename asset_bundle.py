@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import mmap
+import base64
+import tkinter as tk
+
+from bookingsystem import ROUTE_IMAGE_MAP
+
+# --- Packed Asset Bundle ---
+# Build step: icons are pre-resized and packed into one PNG atlas, and the
+# map images are pre-resized and concatenated into one indexed container.
+# At runtime the atlas is read once and the container is memory-mapped, so
+# startup is a handful of sequential reads instead of one open/decode per file.
+BUNDLE_INDEX = "bundle_index.json"
+BUNDLE_ATLAS = "icons_atlas.png"
+BUNDLE_MAPS = "maps.pack"
+
+ATLAS_WIDTH = 512
+
+# (filename, size, is_circular) for every icon the pages request
+ICON_SPECS = [
+    ("logo_enavroom.png", (250, 80), False),
+    ("moto_taxi.png", (60, 60), True),
+    ("car.png", (60, 60), True),
+    ("home.png", (30, 30), False),
+    ("message.png", (30, 30), False),
+    ("history.png", (30, 30), False),
+    ("arrow.png", (25, 25), False),
+    ("enavroom.png", (30, 30), False),
+    ("enacar_2.png", (30, 30), False),
+    ("cash_2.png", (30, 30), False),
+    ("wallet_2.png", (30, 30), False),
+    ("driver_car.png", (100, 100), True),
+    ("driver_moto.png", (100, 100), True),
+]
+
+# Booking page banners plus every pre-rendered route map
+MAP_SPECS = [
+    ("travel_enavroom.png", (375, 160), False),
+    ("travel_enacar.png", (375, 160), False),
+] + [(name, (375, 300), False) for name in sorted(set(ROUTE_IMAGE_MAP.values()))]
+
+
+def bundle_key(filename, size=None, is_circular=False):
+    transform = f"{size[0]}x{size[1]}" if size else "orig"
+    return f"{filename}|{transform}|{int(is_circular)}"
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def build_bundle(source_dir, bundle_dir):
+    """
+    Packs the icons into an atlas and the maps into a single container.
+    Missing source files are skipped; load_image falls back to them as usual.
+    """
+    import io
+    from PIL import Image
+    from asset_cache import transform_image
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    index = {"atlas": {}, "maps": {}, "sources": {}}
+
+    # Icons: simple shelf packing, tallest first
+    icons = []
+    for filename, size, is_circular in ICON_SPECS:
+        path = os.path.join(source_dir, filename)
+        if not os.path.exists(path):
+            print(f"DEBUG: Skipping missing icon: {path}")
+            continue
+        img = transform_image(path, size, is_circular).convert("RGBA")
+        icons.append((bundle_key(filename, size, is_circular), filename, img))
+        index["sources"][filename] = _source_stamp(path)
+    icons.sort(key=lambda item: item[2].size[1], reverse=True)
+
+    placements = []
+    x = y = shelf_height = 0
+    for key, filename, img in icons:
+        w, h = img.size
+        if x + w > ATLAS_WIDTH:
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        placements.append((key, img, x, y))
+        index["atlas"][key] = [x, y, w, h]
+        x += w
+        shelf_height = max(shelf_height, h)
+
+    atlas = Image.new("RGBA", (ATLAS_WIDTH, max(y + shelf_height, 1)), (0, 0, 0, 0))
+    for key, img, x, y in placements:
+        atlas.paste(img, (x, y))
+    atlas.save(os.path.join(bundle_dir, BUNDLE_ATLAS), "PNG")
+
+    # Maps: pre-resized PNGs back to back, indexed by (offset, length)
+    offset = 0
+    with open(os.path.join(bundle_dir, BUNDLE_MAPS), "wb") as pack:
+        for filename, size, is_circular in MAP_SPECS:
+            path = os.path.join(source_dir, filename)
+            if not os.path.exists(path):
+                print(f"DEBUG: Skipping missing map: {path}")
+                continue
+            buf = io.BytesIO()
+            transform_image(path, size, is_circular).save(buf, "PNG")
+            data = buf.getvalue()
+            pack.write(data)
+            index["maps"][bundle_key(filename, size, is_circular)] = [offset, len(data)]
+            index["sources"][filename] = _source_stamp(path)
+            offset += len(data)
+
+    with open(os.path.join(bundle_dir, BUNDLE_INDEX), "w") as f:
+        json.dump(index, f, indent=2)
+    print(f"DEBUG: Bundled {len(index['atlas'])} icons and {len(index['maps'])} maps into {bundle_dir}")
+    return index
+
+
+class AssetBundle:
+    """
+    Runtime reader for a bundle written by build_bundle.
+    get() returns a Tk PhotoImage cropped from the atlas or sliced from the
+    map container, or None when the bundle does not hold that transform.
+    """
+    def __init__(self, bundle_dir):
+        self.bundle_dir = bundle_dir
+        self.atlas = {}
+        self.maps = {}
+        self.sources = {}
+        self._atlas_photo = None
+        self._pack_file = None
+        self._pack = None
+        try:
+            with open(os.path.join(bundle_dir, BUNDLE_INDEX), "r") as f:
+                index = json.load(f)
+            self.atlas = index.get("atlas", {})
+            self.maps = index.get("maps", {})
+            self.sources = index.get("sources", {})
+        except (OSError, ValueError):
+            pass
+
+    def is_fresh(self, filename, source_stamp):
+        """True when the bundled copy was built from the current source file."""
+        return source_stamp is not None and self.sources.get(filename) == list(source_stamp)
+
+    def get(self, filename, size=None, is_circular=False):
+        key = bundle_key(filename, size, is_circular)
+        try:
+            if key in self.atlas:
+                return self._crop(*self.atlas[key])
+            if key in self.maps:
+                return self._slice(*self.maps[key])
+        except (OSError, ValueError, tk.TclError) as e:
+            print(f"DEBUG: Could not read {key} from bundle: {e}")
+        return None
+
+    def _crop(self, x, y, w, h):
+        if self._atlas_photo is None:
+            self._atlas_photo = tk.PhotoImage(file=os.path.join(self.bundle_dir, BUNDLE_ATLAS))
+        photo = tk.PhotoImage(width=w, height=h)
+        photo.tk.call(photo, "copy", self._atlas_photo, "-from", x, y, x + w, y + h, "-to", 0, 0)
+        return photo
+
+    def _slice(self, offset, length):
+        if self._pack is None:
+            self._pack_file = open(os.path.join(self.bundle_dir, BUNDLE_MAPS), "rb")
+            self._pack = mmap.mmap(self._pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._pack[offset:offset + length]
+        return tk.PhotoImage(data=base64.b64encode(data).decode("ascii"))
+
+    def close(self):
+        if self._pack is not None:
+            self._pack.close()
+            self._pack_file.close()
+            self._pack = self._pack_file = None
+
+
+if __name__ == "__main__":
+    # Usage: python asset_bundle.py [source_dir] [bundle_dir]
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.expanduser('~'), 'enavroom_assets')
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.join(source, "bundle")
+    build_bundle(source, target)
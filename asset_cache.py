@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+
+# --- Derived Asset Cache ---
+# Resized / masked copies of the assets are stored as ready-to-display PNGs so
+# warm starts can hand them straight to Tk without decoding the full-size
+# source images or resizing them again.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.enavroom_cache')
+MANIFEST_NAME = "manifest.json"
+
+
+def transform_image(filepath, size=None, is_circular=False):
+    """
+    Opens a source image and applies the same resize / circular mask
+    the UI uses. Returns a PIL image.
+    """
+    from PIL import Image, ImageDraw # Only needed on a cache miss; warm starts never load PIL
+    pil_img = Image.open(filepath)
+    if size:
+        pil_img = pil_img.resize(size, Image.LANCZOS)
+
+    if is_circular:
+        # Create a circular image
+        mask = Image.new('L', pil_img.size, 0)
+        draw = ImageDraw.Draw(mask)
+        draw.ellipse((0, 0) + pil_img.size, fill=255)
+        # Apply mask to the image, assuming RGBA for transparency
+        if pil_img.mode != 'RGBA':
+            pil_img = pil_img.convert('RGBA')
+        pil_img.putalpha(mask)
+    return pil_img
+
+
+class AssetCache:
+    """
+    Persistent cache of transformed assets.
+    The source folder is scanned once at startup; every lookup after that is
+    answered from memory, keyed by source name, mtime, size and transform.
+    """
+    def __init__(self, source_dir, cache_dir=CACHE_DIR):
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self.sources = {}   # filename -> (mtime_ns, size in bytes)
+        self.entries = {}   # cache key -> {"file": ..., "source": ..., "stamp": [...]}
+        self.dirty = False  # Entries added since the manifest was last written (see flush)
+        self.scan()
+        self._load_manifest()
+
+    def scan(self):
+        """Stats every file in the source folder in a single directory scan."""
+        self.sources = {}
+        try:
+            with os.scandir(self.source_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        st = entry.stat()
+                        self.sources[entry.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            print(f"DEBUG: Asset folder not found: {self.source_dir}")
+
+    def exists(self, filename):
+        return filename in self.sources
+
+    def source_path(self, filename):
+        return os.path.join(self.source_dir, filename)
+
+    def key(self, filename, size=None, is_circular=False):
+        mtime_ns, nbytes = self.sources[filename]
+        transform = f"{size[0]}x{size[1]}" if size else "orig"
+        raw = f"{filename}|{mtime_ns}|{nbytes}|{transform}|{int(is_circular)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, filename, size=None, is_circular=False):
+        """Returns the path of a cached PNG for this transform, or None."""
+        if filename not in self.sources:
+            return None
+        entry = self.entries.get(self.key(filename, size, is_circular))
+        if entry is None:
+            return None
+        return os.path.join(self.cache_dir, entry["file"])
+
+    def put(self, filename, size, is_circular, pil_img):
+        """Stores a transformed image and records it in the manifest."""
+        if filename not in self.sources:
+            return None
+        key = self.key(filename, size, is_circular)
+        cached_name = f"{key}.png"
+        cached_path = os.path.join(self.cache_dir, cached_name)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            pil_img.save(cached_path, "PNG")
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: Could not write cached asset {cached_path}: {e}")
+            return None
+
+        self.entries[key] = {
+            "file": cached_name,
+            "source": filename,
+            "stamp": list(self.sources[filename]),
+        }
+        self.dirty = True # Written once by flush(), not once per asset
+        return cached_path
+
+    def flush(self):
+        """Writes the manifest if entries were added since the last write."""
+        if self.dirty:
+            self._save_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+
+        # Drop entries whose source changed or vanished since they were written
+        stale = []
+        for key, entry in entries.items():
+            stamp = self.sources.get(entry.get("source"))
+            if stamp is None or list(stamp) != entry.get("stamp"):
+                stale.append(key)
+        for key in stale:
+            try:
+                os.remove(os.path.join(self.cache_dir, entries[key]["file"]))
+            except (OSError, KeyError):
+                pass
+            del entries[key]
+
+        self.entries = entries
+        if stale:
+            self._save_manifest()
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"DEBUG: Could not write asset manifest: {e}")
+
+    def clear(self):
+        """Removes every cached asset."""
+        for entry in self.entries.values():
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+        self.entries = {}
+        self._save_manifest()
@@ -0,0 +1,67 @@
+import queue
+import threading
+
+# --- Background Worker ---
+# Runs jobs one at a time, in submission order, on a worker thread.
+# Tk is not thread-safe, so completion callbacks are handed back to the UI
+# thread through a results queue that is drained with root.after().
+
+class BackgroundWorker:
+    def __init__(self, root, poll_ms=50, name="enavroom-worker"):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0       # Jobs whose callback has not run yet (UI thread only)
+        self._poll_id = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, on_done=None):
+        """
+        Queues func(*args). on_done(result, error) is called on the UI thread
+        once the job has finished; error is None on success.
+        """
+        self._pending += 1
+        self._jobs.put((func, args, on_done))
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                break
+            func, args, on_done = job
+            try:
+                result, error = func(*args), None
+            except Exception as e:
+                result, error = None, e
+                print(f"DEBUG: Background job {getattr(func, '__name__', func)} failed: {e}")
+            self._results.put((on_done, result, error))
+            self._jobs.task_done()
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                on_done, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if on_done:
+                on_done(result, error)
+        if self._pending > 0:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def flush(self):
+        """Blocks until every queued job has run (e.g. before exiting)."""
+        self._jobs.join()
+
+    def stop(self):
+        self._jobs.put(None)
+        self._thread.join()
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
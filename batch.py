@@ -0,0 +1,200 @@
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+
+from bookingsystem import Booking, BookingSystem, BASE_PRICES, LOCATION_IDS, LOCATION_REGISTRY, get_distance
+from booking_io import iter_csv, append_json_array
+
+# --- Batch Quoting / Booking ---
+# Streams trip requests from JSONL or CSV, prices them in a process pool and
+# streams the results out in input order. "quote" only prices trips; "book"
+# also commits them to bookings.json in chunks from the parent process, so
+# only one process ever writes the store.
+# Input rows: vehicle_type, start, end, and optionally payment_method,
+# promo_code and when (unix time or ISO date; defaults to now).
+
+RESULT_FIELDS = ["line", "vehicle_type", "start", "end", "payment_method", "distance", "cost", "booking_id", "error"]
+COMMIT_CHUNK = 500
+
+_pricing = None
+
+
+def _init_worker():
+    global _pricing
+    _pricing = BookingSystem._default_pricing() # pricing_rules.json if present, else the built-in fares
+
+
+def _parse_when(value):
+    if value in (None, ""):
+        return time.time()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _text(row, field, default=""):
+    value = row.get(field)
+    return str(value).strip() if value not in (None, "") else default
+
+
+def price_request(request):
+    """Pool worker: (line number, request, read error) -> result dict. Never raises."""
+    line, row, error = request
+    if error is None and not isinstance(row, dict):
+        error = f"Expected a JSON object, got {type(row).__name__}"
+    if error is not None:
+        row = {}
+    result = {
+        "line": line,
+        "vehicle_type": _text(row, "vehicle_type"),
+        "start": _text(row, "start"),
+        "end": _text(row, "end"),
+        "payment_method": _text(row, "payment_method", "Cash"),
+        "distance": None,
+        "cost": None,
+        "booking_id": None,
+        "error": error,
+    }
+    if error is not None:
+        return result
+    try:
+        if result["vehicle_type"] not in BASE_PRICES:
+            raise ValueError(f"Unknown vehicle type {result['vehicle_type']!r}")
+        for field in ("start", "end"):
+            if result[field] not in LOCATION_IDS and result[field] not in LOCATION_REGISTRY:
+                raise ValueError(f"Unknown location {result[field]!r}")
+        if result["start"] == result["end"]:
+            raise ValueError("Pickup and drop-off are the same")
+        distance = get_distance(result["start"], result["end"])
+        result["distance"] = distance
+        result["cost"] = _pricing.quote(result["vehicle_type"], distance, result["start"], result["end"],
+                                        _parse_when(row.get("when")), _text(row, "promo_code") or None)
+    except (ValueError, TypeError) as e:
+        result["error"] = str(e)
+    except Exception as e: # Anything else still only fails this row; pool.imap would end the run
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def iter_requests(path):
+    """Yields (line number, row, read error); a bad line becomes an error row instead of ending the run."""
+    if path.lower().endswith(".csv"):
+        for line, row in enumerate(iter_csv(path), 1):
+            yield line, row, None
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line, text in enumerate(f, 1):
+            text = text.strip()
+            if not text:
+                continue
+            try:
+                yield line, json.loads(text), None
+            except ValueError as e:
+                yield line, None, f"Invalid JSON: {e}"
+
+
+class _ResultWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8", newline="") if path and path != "-" else sys.stdout
+        self.csv = None
+        if path and path.lower().endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, result):
+        if self.csv:
+            self.csv.writerow(result)
+        else:
+            self.file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class _Committer:
+    """Book mode: turns priced requests into bookings and appends them to the store a chunk at a time."""
+    def __init__(self, system):
+        self.system = system
+        self.pending = []
+        self.results = []  # Held back until their bookings are on disk, in input order
+        self.system.save() # Fold queued deltas into bookings.json before appending to it
+
+    def add(self, result):
+        """Queues a result; returns the results that are safe to write out."""
+        self.results.append(result)
+        if not result["error"]:
+            booking = Booking(result["vehicle_type"], result["start"], result["end"],
+                              result["distance"], result["cost"], result["payment_method"])
+            result["booking_id"] = booking.id
+            self.pending.append(booking)
+        if len(self.results) >= COMMIT_CHUNK:
+            return self.flush()
+        return []
+
+    def flush(self):
+        if self.pending:
+            append_json_array(self.system.file, self.pending)
+            self.system.log_many(self.pending) # Same BOOKED lines and offset index as BookingSystem.book
+            for booking in self.pending:
+                self.system.add_existing(booking)
+                self.system.surge.record_booking(booking.start)
+            self.pending = []
+        done, self.results = self.results, []
+        return done
+
+
+def run_batch(mode, src, dst=None, workers=None, bookings_file="bookings.json", chunksize=256):
+    """
+    Prices (and in "book" mode, books) every request in `src`, writing results
+    to `dst` in input order. Returns {"rows", "errors", "seconds", "rows_per_second"}.
+    """
+    workers = workers or os.cpu_count() or 1
+    writer = _ResultWriter(dst)
+    committer = _Committer(BookingSystem(bookings_file)) if mode == "book" else None
+    rows = errors = 0
+    started = time.perf_counter()
+    try:
+        with multiprocessing.get_context("spawn").Pool(workers, initializer=_init_worker) as pool:
+            # imap keeps input order while workers run ahead; nothing is held but the window in flight
+            for result in pool.imap(price_request, iter_requests(src), chunksize=chunksize):
+                rows += 1
+                errors += bool(result["error"])
+                for ready in committer.add(result) if committer else (result,):
+                    writer.write(ready)
+        if committer:
+            for ready in committer.flush():
+                writer.write(ready)
+    finally:
+        writer.close()
+    seconds = time.perf_counter() - started
+    return {"rows": rows, "errors": errors, "seconds": seconds, "rows_per_second": rows / seconds if seconds else 0.0}
+
+
+def add_arguments(parser):
+    parser.add_argument("mode", choices=["quote", "book"], help="Only price the trips, or book them too")
+    parser.add_argument("input", help="Trip requests (.jsonl or .csv)")
+    parser.add_argument("-o", "--output", default="-", help="Results file (.jsonl or .csv; default stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--bookings", default="bookings.json", help="Bookings file used in book mode")
+
+
+def main(args):
+    report = run_batch(args.mode, args.input, args.output, args.workers, args.bookings)
+    print(f"{args.mode}: {report['rows']} rows ({report['errors']} errors) in {report['seconds']:.2f}s "
+          f"= {report['rows_per_second']:.0f} rows/s", file=sys.stderr)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch-quote or batch-book trips from a file.")
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
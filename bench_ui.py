@@ -0,0 +1,197 @@
+"""
+Headless UI latency benchmark for the booking flow.
+
+Runs App under a virtual X server (Xvfb is started when DISPLAY is not set),
+scripts the full booking flow for both services and records, for every
+show_frame call, how long on_show took and how long until Tk was idle again.
+
+Usage:
+    python bench_ui.py [--runs N] [--json results.json] [--baseline old.json] [--tolerance 0.25]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import statistics
+
+XVFB_DISPLAY = ":99"
+
+# (vehicle_type, booking page, driver page) for each scripted flow
+FLOWS = [
+    ("Enavroom-vroom", "BookEnavroomPage", "WeFoundDriverEnavroomPage"),
+    ("Car (4-seater)", "BookEnacarPage", "WeFoundDriverEnacarPage"),
+]
+
+
+def start_virtual_display(display=XVFB_DISPLAY):
+    """Starts Xvfb when there is no display. Returns the process (or None)."""
+    if os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        raise SystemExit("Xvfb not found: install xvfb or run with a DISPLAY set.")
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1024x768x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket_path = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    deadline = time.time() + 5
+    while not os.path.exists(socket_path):
+        if proc.poll() is not None or time.time() > deadline:
+            proc.kill()
+            raise SystemExit("Xvfb failed to start.")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+def wait_idle(app):
+    """Processes pending events and redraws until Tk has nothing left to do right now."""
+    app.update_idletasks()
+    app.update()
+
+
+def instrument(app, samples):
+    """Wraps show_frame / on_show on this App instance so every transition is timed."""
+    original_show_frame = app.show_frame
+
+    for page_name, frame in app.frames.items():
+        if hasattr(frame, "on_show"):
+            def timed_on_show(original=frame.on_show, page_name=page_name):
+                start = time.perf_counter()
+                original()
+                app._bench_on_show[page_name] = (time.perf_counter() - start) * 1000
+            frame.on_show = timed_on_show
+
+    def timed_show_frame(page_name):
+        app._bench_on_show.pop(page_name, None)
+        start = time.perf_counter()
+        original_show_frame(page_name)
+        shown = time.perf_counter()
+        wait_idle(app)
+        idle = time.perf_counter()
+        samples.append({
+            "page": page_name,
+            "on_show_ms": app._bench_on_show.get(page_name, 0.0),
+            "show_frame_ms": (shown - start) * 1000,
+            "time_to_idle_ms": (idle - start) * 1000,
+        })
+
+    app._bench_on_show = {}
+    app.show_frame = timed_show_frame
+
+
+def run_flow(app, vehicle_type, booking_page, driver_page):
+    """StartPage -> HomePage -> booking page -> ... -> DonePage -> HistoryPage."""
+    frames = app.frames
+    app.show_frame("StartPage")
+    app.show_frame("HomePage")
+    app.update_booking_details(vehicle_type=vehicle_type)
+    app.show_frame(booking_page)
+    frames[booking_page]._on_book_now()                 # -> PUandDOPage
+    frames["PUandDOPage"]._on_book_now()                # -> MapPage
+    frames["MapPage"]._on_book_now()                    # -> LoadingPage
+    frames["LoadingPage"]._transition_to_driver_found() # -> WeFoundDriver*Page
+    frames[driver_page]._transition_to_done()           # -> DonePage
+    app.show_frame("HistoryPage")
+
+
+def summarize(samples):
+    by_page = {}
+    for sample in samples:
+        by_page.setdefault(sample["page"], []).append(sample)
+    summary = {}
+    for page, rows in by_page.items():
+        idle = [r["time_to_idle_ms"] for r in rows]
+        summary[page] = {
+            "count": len(rows),
+            "on_show_median_ms": statistics.median(r["on_show_ms"] for r in rows),
+            "idle_median_ms": statistics.median(idle),
+            "idle_max_ms": max(idle),
+        }
+    return summary
+
+
+def print_report(startup_ms, summary, baseline=None):
+    print(f"\nApp startup: {startup_ms:.1f} ms")
+    print(f"{'Page':<28}{'n':>4}{'on_show':>10}{'idle med':>10}{'idle max':>10}{'vs base':>10}")
+    for page, row in summary.items():
+        delta = ""
+        if baseline and page in baseline.get("pages", {}):
+            base = baseline["pages"][page]["idle_median_ms"]
+            delta = f"{(row['idle_median_ms'] - base) / base * 100:+.0f}%" if base else ""
+        print(f"{page:<28}{row['count']:>4}{row['on_show_median_ms']:>10.1f}"
+              f"{row['idle_median_ms']:>10.1f}{row['idle_max_ms']:>10.1f}{delta:>10}")
+
+
+def find_regressions(summary, baseline, tolerance):
+    regressions = []
+    for page, row in summary.items():
+        base = baseline.get("pages", {}).get(page)
+        if base and base["idle_median_ms"] > 0:
+            if row["idle_median_ms"] > base["idle_median_ms"] * (1 + tolerance):
+                regressions.append(page)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Enavroom screen latency under Xvfb.")
+    parser.add_argument("--runs", type=int, default=5, help="Times to run each booking flow")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json result")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    # Resolve output paths before switching to the scratch directory
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    if args.baseline:
+        args.baseline = os.path.abspath(args.baseline)
+
+    xvfb = start_virtual_display()
+    # Bookings and logs go to a scratch directory so real history is untouched
+    workdir = tempfile.mkdtemp(prefix="enavroom_bench_")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(workdir)
+    try:
+        start = time.perf_counter()
+        from gui import App
+        app = App()
+        wait_idle(app)
+        startup_ms = (time.perf_counter() - start) * 1000
+
+        samples = []
+        instrument(app, samples)
+        for _ in range(args.runs):
+            for flow in FLOWS:
+                run_flow(app, *flow)
+
+        app.writer.flush()
+        app.destroy()
+    finally:
+        if xvfb:
+            xvfb.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    summary = summarize(samples)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    print_report(startup_ms, summary, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"startup_ms": startup_ms, "pages": summary, "samples": samples}, f, indent=2)
+
+    if baseline:
+        regressions = find_regressions(summary, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSION: slower than baseline by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import os
+import time
+import threading
+
+# --- Booking IDs ---
+# 16-character IDs: a 48-bit millisecond timestamp followed by 32 bits that
+# start random each millisecond and count up within it (like ULID), written
+# in lowercase Crockford base32. IDs sort as strings in creation order, never
+# repeat within a process even if the clock steps back, and carry their own
+# creation time. Older 8-character hex IDs are still accepted everywhere.
+
+ALPHABET = "0123456789abcdefghjkmnpqrstvwxyz"  # Crockford base32, ASCII-sorted
+ID_LENGTH = 16
+LEGACY_ID_LENGTH = 8
+_DECODE = {ch: i for i, ch in enumerate(ALPHABET)}
+_COUNTER_MAX = (1 << 32) - 1
+
+
+def _encode(value, length):
+    chars = []
+    for _ in range(length):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class IdGenerator:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def new_id(self):
+        with self._lock:
+            ms = int(self._clock() * 1000)
+            if ms > self._last_ms:
+                self._last_ms = ms
+                self._counter = int.from_bytes(os.urandom(4), "big") >> 1 # Headroom to count up
+            elif self._counter < _COUNTER_MAX:
+                self._counter += 1 # Same millisecond (or clock went back): stay ordered
+            else:
+                self._last_ms += 1 # Counter exhausted: borrow the next millisecond
+                self._counter = 0
+            return _encode((self._last_ms << 32) | self._counter, ID_LENGTH)
+
+
+_generator = IdGenerator()
+
+
+def new_id():
+    return _generator.new_id()
+
+
+def is_legacy_id(booking_id):
+    return len(booking_id) != ID_LENGTH or any(ch not in _DECODE for ch in booking_id)
+
+
+def id_timestamp(booking_id):
+    """Creation time (unix seconds) encoded in an ID, or None for legacy IDs."""
+    if not booking_id or is_legacy_id(booking_id):
+        return None
+    value = 0
+    for ch in booking_id:
+        value = (value << 5) | _DECODE[ch]
+    return (value >> 32) / 1000
+
+
+def id_range(start_time, end_time):
+    """(low, high) ID strings bracketing every ID created between two unix times."""
+    low = _encode(int(start_time * 1000) << 32, ID_LENGTH)
+    high = _encode((int(end_time * 1000) << 32) | _COUNTER_MAX, ID_LENGTH)
+    return low, high
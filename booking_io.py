@@ -0,0 +1,338 @@
+import os
+import csv
+import sys
+import re
+import json
+
+from bookingsystem import Booking, BookingSystem
+from lifecycle import STATES, LEGACY_STATUSES, TERMINAL_STATES, REQUESTED, normalize_status
+
+# --- Bulk Export / Import ---
+# Everything here streams: records are read, validated and written a chunk at
+# a time, so moving millions of bookings never needs them all in memory.
+
+BOOKING_FIELDS = ["id", "vehicle_type", "start", "end", "distance", "cost", "payment_method", "status", "created_at"]
+VALID_STATUSES = set(STATES) | set(LEGACY_STATUSES)
+READ_CHUNK = 1 << 16
+_SEPARATOR = re.compile(r"[\s,]*") # Whitespace and commas between array items
+
+
+def _as_dict(record):
+    return record.to_dict() if isinstance(record, Booking) else record
+
+
+# --- Readers ---
+
+def iter_json_array(path):
+    """Yields the objects of a JSON array file (like bookings.json) one at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = f.read(READ_CHUNK).lstrip()
+        if not buf:
+            return
+        if buf[0] != "[":
+            raise ValueError(f"{path} is not a JSON array")
+        idx = 1 # Decoding moves an index through the buffer; it is only trimmed when more is read
+        eof = False
+        while True:
+            idx = _SEPARATOR.match(buf, idx).end()
+            if buf.startswith("]", idx):
+                return
+            try:
+                obj, idx = decoder.raw_decode(buf, idx)
+            except ValueError:
+                # Object cut off by the chunk boundary: read more and retry
+                if eof:
+                    raise
+                more = f.read(READ_CHUNK)
+                eof = not more
+                buf = buf[idx:] + more
+                idx = 0
+                continue
+            yield obj
+            if len(buf) - idx < READ_CHUNK and not eof:
+                more = f.read(READ_CHUNK)
+                eof = not more
+                buf = buf[idx:] + more
+                idx = 0
+
+
+def iter_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_csv(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def parse_log_line(line):
+    """
+    Recovers a record from a booking_log.txt line:
+    ACTION | ID: x | vehicle | start → end | 1.5 km | ₱95.00 | Cash | STATUS: active
+    """
+    parts = [part.strip() for part in line.strip().split(" | ")]
+    if len(parts) != 8 or not parts[1].startswith("ID: ") or not parts[7].startswith("STATUS: "):
+        raise ValueError(f"Unrecognised log line: {line.strip()!r}")
+    start, sep, end = parts[3].partition(" → ")
+    if not sep:
+        raise ValueError(f"Unrecognised route in log line: {parts[3]!r}")
+    return {
+        "action": parts[0],
+        "id": parts[1][len("ID: "):],
+        "vehicle_type": parts[2],
+        "start": start,
+        "end": end,
+        "distance": parts[4].removesuffix(" km"),
+        "cost": parts[5].lstrip("₱"),
+        "payment_method": parts[6],
+        "status": parts[7][len("STATUS: "):],
+    }
+
+
+def iter_log(path, errors=None):
+    """Yields records parsed from booking_log.txt; bad lines go to `errors` if given."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield parse_log_line(line)
+            except ValueError as e:
+                if errors is None:
+                    raise
+                errors.append((line_no, str(e)))
+
+
+def iter_log_bookings(path, errors=None):
+    """
+    One record per booking from booking_log.txt. Every lifecycle step logs its
+    own line (BOOKED, MATCHED, ..., COMPLETED), so later lines for an ID update
+    the record and the last status wins. A booking is yielded as soon as it
+    reaches a terminal state; the ones still open at the end of the log follow
+    in the order they first appeared. Memory grows with the open bookings only.
+    """
+    open_bookings = {}
+    for record in iter_log(path, errors):
+        if LEGACY_STATUSES.get(record["status"], record["status"]) in TERMINAL_STATES:
+            open_bookings.pop(record["id"], None)
+            yield record
+        else:
+            open_bookings[record["id"]] = record
+    yield from open_bookings.values()
+
+
+def iter_records(path, errors=None):
+    """Picks a reader from the file extension (.json, .jsonl, .csv, .txt/.log)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        return iter_jsonl(path)
+    if ext == ".csv":
+        return iter_csv(path)
+    if ext in (".txt", ".log"):
+        return iter_log_bookings(path, errors)
+    return iter_json_array(path)
+
+
+# --- Validation ---
+
+def validate_record(record):
+    """Returns a clean booking dict or raises ValueError."""
+    clean = {}
+    for field in ("id", "vehicle_type", "start", "end"):
+        value = record.get(field)
+        if not value or not isinstance(value, str):
+            raise ValueError(f"Missing or invalid {field}: {value!r}")
+        clean[field] = value.strip()
+    try:
+        clean["distance"] = float(record.get("distance"))
+        cost = float(record.get("cost"))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid distance/cost in booking {clean['id']}")
+    if clean["distance"] < 0 or cost < 0:
+        raise ValueError(f"Negative distance/cost in booking {clean['id']}")
+    clean["cost"] = int(cost) if cost == int(cost) else cost
+    clean["payment_method"] = record.get("payment_method") or "Cash"
+    status = record.get("status") or REQUESTED
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Unknown status {status!r} in booking {clean['id']}")
+    clean["status"] = normalize_status(status)
+    created_at = record.get("created_at")
+    if created_at in (None, ""):
+        clean["created_at"] = None # Older records; Booking falls back to the ID
+    else:
+        try:
+            clean["created_at"] = float(created_at)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid created_at in booking {clean['id']}: {created_at!r}")
+    return clean
+
+
+# --- Writers ---
+
+def export_bookings(records, path, fmt=None, chunk_size=1000):
+    """
+    Streams bookings (Booking objects or dicts) to CSV or JSONL, writing one
+    chunk of rows at a time. Returns the number of rows written.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format: {fmt}")
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=BOOKING_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            chunk = []
+            for record in records:
+                chunk.append(_as_dict(record))
+                if len(chunk) >= chunk_size:
+                    writer.writerows(chunk)
+                    count += len(chunk)
+                    chunk = []
+            writer.writerows(chunk)
+            count += len(chunk)
+        else:
+            chunk = []
+            for record in records:
+                chunk.append(json.dumps(_as_dict(record), ensure_ascii=False) + "\n")
+                if len(chunk) >= chunk_size:
+                    f.writelines(chunk)
+                    count += len(chunk)
+                    chunk = []
+            f.writelines(chunk)
+            count += len(chunk)
+    return count
+
+
+def append_json_array(path, records):
+    """
+    Appends records to a JSON array file in place (one commit), without
+    reading or rewriting what is already there.
+    """
+    payload = ",\n".join(json.dumps(_as_dict(r), indent=2, ensure_ascii=False) for r in records)
+    if not payload:
+        return
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[\n" + payload + "\n]")
+            f.flush()
+            os.fsync(f.fileno())
+        return
+    with open(path, "r+b") as f:
+        # Walk back from the end to the closing bracket
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            pos -= 1
+            f.seek(pos)
+            ch = f.read(1)
+            if ch == b"]":
+                break
+            if not ch.isspace():
+                raise ValueError(f"{path} does not end with a JSON array")
+        else:
+            raise ValueError(f"{path} does not end with a JSON array")
+        # Is the array empty? Look back for the previous non-space byte
+        prev = pos
+        while prev > 0:
+            prev -= 1
+            f.seek(prev)
+            ch = f.read(1)
+            if not ch.isspace():
+                break
+        separator = "\n" if ch == b"[" else ",\n"
+        f.seek(pos)
+        f.truncate()
+        f.write((separator + payload + "\n]").encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def import_bookings(system, path, batch_size=1000, errors=None):
+    """
+    Validates records from `path` and adds them to `system`, committing each
+    batch by appending it to the bookings file. Records whose ID already
+    exists, hot or archived, are skipped. Returns (imported, rejected).
+    """
+    errors = [] if errors is None else errors
+    if system.writer:
+        system.writer.flush() # Queued snapshots must land before we append
+    system.save() # Make sure the file matches memory before appending to it
+    known_ids = {b.id for b in system.bookings}
+    imported = 0
+    batch = []
+
+    def commit(batch):
+        append_json_array(system.file, batch)
+        for booking in batch:
+            system.add_existing(booking)
+
+    for n, record in enumerate(iter_records(path, errors), 1):
+        try:
+            clean = validate_record(record)
+        except ValueError as e:
+            errors.append((n, str(e)))
+            continue
+        if clean["id"] in known_ids or system.archive.get(clean["id"]) is not None:
+            errors.append((n, f"Duplicate booking ID {clean['id']}"))
+            continue
+        known_ids.add(clean["id"])
+        batch.append(Booking(**clean))
+        if len(batch) >= batch_size:
+            commit(batch)
+            imported += len(batch)
+            batch = []
+    if batch:
+        commit(batch)
+        imported += len(batch)
+    return imported, len(errors)
+
+
+def convert(src, dst, chunk_size=1000, errors=None):
+    """Streams records from one file format to another (validating them on the way)."""
+    errors = [] if errors is None else errors
+
+    def valid_records():
+        for n, record in enumerate(iter_records(src, errors), 1):
+            try:
+                yield validate_record(record)
+            except ValueError as e:
+                errors.append((n, str(e)))
+
+    if dst.lower().endswith(".json"):
+        # Same layout as bookings.json, written incrementally
+        count = 0
+        with open(dst, "w", encoding="utf-8") as f:
+            f.write("[")
+            for record in valid_records():
+                f.write(("\n" if count == 0 else ",\n") + json.dumps(record, indent=2, ensure_ascii=False))
+                count += 1
+            f.write("\n]")
+        return count
+    return export_bookings(valid_records(), dst, chunk_size=chunk_size)
+
+
+if __name__ == "__main__":
+    # Usage:
+    #   python booking_io.py export <bookings.json> <out.csv|out.jsonl>
+    #   python booking_io.py import <in.csv|in.jsonl|booking_log.txt> [bookings.json]
+    #   python booking_io.py convert <src> <dst>
+    if len(sys.argv) < 3 or sys.argv[1] not in ("export", "import", "convert"):
+        print("Usage: python booking_io.py export|import|convert <src> [<dst>]")
+        sys.exit(2)
+    command, src = sys.argv[1], sys.argv[2]
+    problems = []
+    if command == "export":
+        print(f"Exported {export_bookings(iter_json_array(src), sys.argv[3])} bookings.")
+    elif command == "convert":
+        print(f"Converted {convert(src, sys.argv[3], errors=problems)} records.")
+    else:
+        target = BookingSystem(sys.argv[3] if len(sys.argv) > 3 else "bookings.json")
+        imported, rejected = import_bookings(target, src, errors=problems)
+        print(f"Imported {imported} bookings, rejected {rejected}.")
+    for line_no, message in problems[:20]:
+        print(f"  record {line_no}: {message}")
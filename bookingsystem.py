@@ -1,6 +1,18 @@
 import json
-import uuid
 import math
+import os
+import time
+from array import array
+from pricing import PricingEngine, QuoteCache, default_rules
+from surge import SurgeTracker
+from locations import LocationRegistry
+from analytics import BookingAnalytics
+import log_index
+from booking_ids import new_id, id_timestamp
+from storage import BookingArchive
+from lifecycle import (REQUESTED, MATCHED, EN_ROUTE, COMPLETED, CANCELLED, TERMINAL_STATES, InvalidTransition,
+                       StateIndex, DeltaLog, check_transition, normalize_status)
+from eta import EtaEngine, write_state
 
 # --- Booking System Logic (Copied from previous code) ---
 LOCATIONS = ["PUP Main", "CEA", "Hasmin", "iTech", "COC", "PUP LHS", "Condotel"]
@@ -29,78 +41,80 @@ DISTANCE_MATRIX = {
     ("PUP LHS", "Condotel"): 2.0,
 }
 
-ROUTE_IMAGE_MAP = {
+# One entry per route; the reverse direction uses the same image
+ROUTE_IMAGES = {
     ("PUP Main", "CEA"): "pup_main_to_cea.jpg",
-    ("CEA", "PUP Main"): "pup_main_to_cea.jpg",
-
     ("PUP Main", "Hasmin"): "pup_main_to_hasmin.jpg",
-    ("Hasmin", "PUP Main"): "pup_main_to_hasmin.jpg",
-
     ("PUP Main", "iTech"): "pup_main_to_itech.jpg",
-    ("iTech", "PUP Main"): "pup_main_to_itech.jpg",
-
     ("PUP Main", "COC"): "pup_main_to_coc.jpg",
-    ("COC", "PUP Main"): "pup_main_to_coc.jpg",
-
     ("PUP Main", "PUP LHS"): "pup_main_to_pup_lhs.png",
-    ("PUP LHS", "PUP Main"): "pup_main_to_pup_lhs.png",
-
     ("PUP Main", "Condotel"): "pup_main_to_condotel.jpg",
-    ("Condotel", "PUP Main"): "pup_main_to_condotel.jpg",
-
     ("CEA", "Hasmin"): "cea_to_hasmin.jpg",
-    ("Hasmin", "CEA"): "cea_to_hasmin.jpg",
-
     ("CEA", "iTech"): "cea_to_itech.jpg",
-    ("iTech", "CEA"): "cea_to_itech.jpg",
-
     ("CEA", "COC"): "cea_to_coc.jpg",
-    ("COC", "CEA"): "cea_to_coc.jpg",
-
     ("CEA", "PUP LHS"): "cea_to_pup_lhs.jpg",
-    ("PUP LHS", "CEA"): "cea_to_pup_lhs.jpg",
-
     ("CEA", "Condotel"): "cea_to_condotel.jpg",
-    ("Condotel", "CEA"): "cea_to_condotel.jpg",
-
     ("Hasmin", "iTech"): "hasmin_to_itech.jpg",
-    ("iTech", "Hasmin"): "hasmin_to_itech.jpg",
-
     ("Hasmin", "COC"): "hasmin_to_coc.jpg",
-    ("COC", "Hasmin"): "hasmin_to_coc.jpg",
-
     ("Hasmin", "PUP LHS"): "hasmin_to_pup_lhs.jpg",
-    ("PUP LHS", "Hasmin"): "hasmin_to_pup_lhs.jpg",
-
     ("Hasmin", "Condotel"): "hasmin_to_condotel.jpg",
-    ("Condotel", "Hasmin"): "hasmin_to_condotel.jpg",
-
     ("iTech", "COC"): "itech_to_coc.jpg",
-    ("COC", "iTech"): "itech_to_coc.jpg",
-
     ("iTech", "PUP LHS"): "itech_to_pup_lhs.jpg",
-    ("PUP LHS", "iTech"): "itech_to_pup_lhs.jpg",
-
     ("iTech", "Condotel"): "itech_to_condotel.jpg",
-    ("Condotel", "iTech"): "itech_to_condotel.jpg",
-
     ("COC", "PUP LHS"): "coc_to_pup_lhs.jpg",
-    ("PUP LHS", "COC"): "coc_to_pup_lhs.jpg",
-
     ("COC", "Condotel"): "coc_to_condotel.jpg",
-    ("Condotel", "COC"): "coc_to_condotel.jpg",
-
     ("PUP LHS", "Condotel"): "pup_lhs_to_condotel.jpg",
-    ("Condotel", "PUP LHS"): "pup_lhs_to_condotel.jpg"
 }
 
-_temp_matrix = {}
-for (loc1, loc2), dist in DISTANCE_MATRIX.items():
-    _temp_matrix[(loc1, loc2)] = dist
-    _temp_matrix[(loc2, loc1)] = dist
-    
-DISTANCE_MATRIX = _temp_matrix
+ROUTE_IMAGE_MAP = {}
+for (loc1, loc2), image in ROUTE_IMAGES.items():
+    ROUTE_IMAGE_MAP[(loc1, loc2)] = image
+    ROUTE_IMAGE_MAP[(loc2, loc1)] = image
+
+# Approximate coordinates of the service points (Sta. Mesa, Manila)
+LOCATION_COORDS = {
+    "PUP Main": (14.5979, 121.0108),
+    "CEA": (14.6003, 121.0271),
+    "Hasmin": (14.5993, 121.0148),
+    "iTech": (14.5891, 121.0135),
+    "COC": (14.5925, 121.0120),
+    "PUP LHS": (14.6008, 121.0162),
+    "Condotel": (14.5910, 121.0171),
+}
 
+LOCATION_REGISTRY = LocationRegistry()
+for _name, (_lat, _lon) in LOCATION_COORDS.items():
+    LOCATION_REGISTRY.add(_name, _lat, _lon)
+
+# --- Dense distance table ---
+# Every location name is interned to a small integer id, and distances live in
+# one flat array of doubles holding the lower triangle of the symmetric matrix
+# (row i has i + 1 entries), so a new location just appends a row.
+# NaN marks pairs that have not been measured or estimated yet.
+LOCATION_IDS = {}
+_distances = array("d")
+
+def location_id(name):
+    """Returns the integer id for a location name, interning it on first use."""
+    loc_id = LOCATION_IDS.get(name)
+    if loc_id is None:
+        loc_id = len(LOCATION_IDS)
+        LOCATION_IDS[name] = loc_id
+        _distances.extend([math.nan] * loc_id + [0.0])
+    return loc_id
+
+def _pair_index(i, j):
+    if i < j:
+        i, j = j, i
+    return i * (i + 1) // 2 + j
+
+def set_distance(start, end, distance):
+    _distances[_pair_index(location_id(start), location_id(end))] = distance
+
+for _name in LOCATIONS:
+    location_id(_name)
+for (loc1, loc2), dist in DISTANCE_MATRIX.items():
+    set_distance(loc1, loc2, dist)
 
 VEHICLE_SURCHARGES = {
     "Enavroom-vroom": 0,
@@ -114,85 +128,368 @@ BASE_PRICES = {
     "Car (6-seater)": 450
 }
 
+# Optional fare rules (time bands, route overrides, minimum fares, promos)
+PRICING_RULES_FILE = "pricing_rules.json"
+CLOSED_STATUSES = TERMINAL_STATES         # Bookings that can move to the archive
+ARCHIVE_AFTER_SECONDS = 24 * 60 * 60      # How long closed bookings stay in bookings.json
+ARCHIVE_CHECK_SECONDS = 60 * 60           # How often a long-running app looks for bookings to archive
+
 def get_distance(start, end):
     if start == end:
         return 0
-    distance = DISTANCE_MATRIX.get((start, end))
+    i = LOCATION_IDS.get(start)
+    j = LOCATION_IDS.get(end)
+    if i is not None and j is not None:
+        distance = _distances[_pair_index(i, j)]
+        if distance == distance: # NaN check
+            return distance
+    # Pairs nobody measured by hand are estimated from coordinates (and remembered)
+    distance = LOCATION_REGISTRY.distance(start, end)
     if distance is None:
-        distance = DISTANCE_MATRIX.get((end, start), 0)
+        return 0
+    set_distance(start, end, distance)
     return distance
 
+def register_location(name, lat, lon):
+    """Adds a service point; distances to it are estimated until set_distance() measures them."""
+    LOCATION_REGISTRY.add(name, lat, lon)
+    return location_id(name)
+
+def nearest_pickup_point(lat, lon):
+    """Name of the registered location closest to a coordinate (None if there are none)."""
+    location = LOCATION_REGISTRY.nearest(lat, lon)
+    return location.name if location else None
+
+def pickup_points_within(lat, lon, radius_km):
+    """[(name, km), ...] of registered locations within radius_km, nearest first."""
+    return [(loc.name, km) for loc, km in LOCATION_REGISTRY.within_radius(lat, lon, radius_km)]
+
 class Booking:
-    def __init__(self, vehicle_type, start, end, distance, cost, payment_method="Cash", status ="active"):
+    def __init__(self, vehicle_type, start, end, distance, cost, payment_method="Cash", status =REQUESTED, id=None, created_at=None):
 
-        self.id = str(uuid.uuid4())[:8]
+        self.id = id or new_id() # Saved bookings keep their ID when loaded
         self.vehicle_type = vehicle_type
         self.start = start
         self.end = end
         self.distance = distance
         self.cost = cost
         self.payment_method = payment_method
-        self.status = status
+        self.status = normalize_status(status) # Old "active" bookings load as requested
+        # Unix time the booking was made; taken from the ID unless given (None for old 8-char IDs)
+        self.created_at = created_at if created_at is not None else id_timestamp(self.id)
 
     def to_dict(self):
         return self.__dict__
 
 class BookingSystem:
-    def __init__(self, file="bookings.json"):
+    def __init__(self, file="bookings.json", log_file="booking_log.txt", pricing=None, archive_dir=None):
         self.file = file
+        self.log_file = log_file
+        self.log_index = log_index.LogIndex(log_file) # Kept open; appends keep it current
         self.bookings = []
-        self.load()
+        self._by_id = {}             # booking_id -> Booking, for the hot bookings
+        self.states = StateIndex()   # lifecycle state -> booking IDs
+        # Status changes and new bookings are appended here; each full snapshot empties it
+        self.deltas = DeltaLog(os.path.splitext(file)[0] + ".deltas.jsonl")
+        self.archive = BookingArchive(archive_dir or os.path.join(os.path.dirname(os.path.abspath(file)), "booking_archive"))
+        self.pricing = pricing or self._default_pricing()
+        self.surge = SurgeTracker()  # Rolling demand per pickup location, fed by book/cancel
+        self.quotes = QuoteCache()
+        self.analytics = BookingAnalytics()
+        # Trip times per vehicle / time of day, learned from completed trips
+        self.eta_engine = EtaEngine(LOCATION_IDS, get_distance)
+        self.eta_file = os.path.splitext(file)[0] + ".eta.json"
+        self.eta_engine.load(self.eta_file)
+        self._trip_started = {}      # booking_id -> when it went en route, to time the trip
+        # Optional BackgroundWorker; when set, state changes are persisted off the UI thread
+        self.writer = None
+        self.load() # Read-only: archiving is left to the app's scheduler and `main.py archive`
+
+    @staticmethod
+    def _default_pricing():
+        defaults = default_rules(BASE_PRICES, VEHICLE_SURCHARGES)
+        if os.path.exists(PRICING_RULES_FILE):
+            return PricingEngine.from_file(PRICING_RULES_FILE, defaults)
+        return PricingEngine(defaults=defaults)
+
+    def calculate_cost(self, vehicle_type, distance, start=None, end=None, when=None, promo_code=None):
+        surge = self.surge.multiplier(start, when) if start else 1.0
+        return self.pricing.quote(vehicle_type, distance, start, end, when, promo_code, surge)
+
+    def pricing_version(self, start=None):
+        """Everything besides the trip itself that a quote depends on."""
+        surge = self.surge.multiplier(start) if start else 1.0
+        return (self.pricing.version, surge)
+
+    def quote(self, vehicle_type, start, end):
+        """Returns (distance, cost) for a trip now, memoized per pricing version."""
+        key = (vehicle_type, start, end, self.pricing_version(start))
+        cached = self.quotes.get(key)
+        if cached is not None:
+            return cached
+        now = time.time()
+        distance = get_distance(start, end)
+        result = (distance, self.calculate_cost(vehicle_type, distance, start, end, now))
+        self.quotes.put(key, result, now, self.pricing.valid_until(now))
+        return result
 
-    def calculate_cost(self, vehicle_type, distance):
-        base_fare = BASE_PRICES.get(vehicle_type, 75)
-        if distance > 1:
-            additional_km = math.ceil(distance - 1)
-            base_fare += additional_km * 10
-        surcharge = VEHICLE_SURCHARGES.get(vehicle_type, 0)
-        return base_fare + surcharge
+    def reload_pricing(self, rules):
+        """Recompiles the fare rules and drops every cached quote."""
+        self.pricing.load_rules(rules)
+        self.quotes.invalidate()
 
     def book(self, vehicle_type, start, end, payment_method="Cash"):
-        distance = get_distance(start, end)
-        cost = self.calculate_cost(vehicle_type, distance)
+        distance, cost = self.quote(vehicle_type, start, end)
         booking = Booking(vehicle_type, start, end, distance, cost, payment_method)
-        self.bookings.append(booking)
+        self._track(booking)
+        self.surge.record_booking(start)
+        self.analytics.record_booking(booking)
+        delta = {"op": "create", "ts": time.time(), "booking": dict(booking.to_dict())}
+        self._queue_delta(delta, self._format_log_entry(booking, action="Booked"), booking.id)
         print(f"DEBUG: New booking created: {booking.to_dict()}")
         return booking
 
+    def _track(self, booking):
+        self.bookings.append(booking)
+        self._by_id[booking.id] = booking
+        self.states.add(booking.id, booking.status)
+
+    def add_existing(self, booking):
+        """Adds an already-persisted booking (e.g. from an import) to memory and the aggregates."""
+        self._track(booking)
+        self.analytics.record_booking(booking)
+        if booking.status == CANCELLED:
+            self.analytics.record_cancel(booking)
+
+    def transition(self, booking_id, new_status, on_saved=None):
+        """
+        Moves a booking to the next lifecycle state (raises InvalidTransition
+        for moves the lifecycle doesn't allow). Only a small delta record and a
+        log line are written; with a writer attached both are queued and
+        on_saved(result, error) fires once they are on disk.
+        """
+        booking = self._by_id.get(booking_id)
+        if booking is None:
+            raise KeyError(f"No active booking {booking_id}")
+        old_status = booking.status
+        check_transition(old_status, new_status)
+        booking.status = new_status
+        self.states.move(booking.id, old_status, new_status)
+        if new_status == CANCELLED:
+            self.surge.record_cancel(booking.start, booking.created_at)
+            self.analytics.record_cancel(booking)
+        if new_status == MATCHED:
+            self.surge.record_supply(booking.start, -1) # A driver near the pickup is now busy
+        elif old_status in (MATCHED, EN_ROUTE) and new_status in TERMINAL_STATES:
+            # The driver is free again: at the drop-off after a trip, near the pickup after a cancel
+            self.surge.record_supply(booking.end if new_status == COMPLETED else booking.start, 1)
+        self._time_trip(booking, new_status)
+        delta = {"op": "transition", "ts": time.time(), "id": booking.id, "from": old_status, "to": new_status}
+        self._queue_delta(delta, self._format_log_entry(booking, action=new_status), booking.id, on_saved)
+        print(f"DEBUG: Booking {booking.id}: {old_status} -> {new_status}")
+        return booking
 
-    def cancel(self, booking_id):
-        for booking in self.bookings:
-            if booking.id == booking_id:
-                booking.status = "cancelled"
-                self.save()
-                self.log_to_txt(booking, action="Cancelled")  # <- NEW
-                return True
-        return False
+    def cancel(self, booking_id, on_saved=None):
+        """Cancels a booking; False if it is unknown or already completed."""
+        booking = self._by_id.get(booking_id)
+        if booking is None:
+            return False
+        if booking.status == CANCELLED:
+            return True
+        try:
+            self.transition(booking_id, CANCELLED, on_saved)
+        except InvalidTransition:
+            return False
+        return True
+
+    def eta(self, vehicle_type, start, end, when=None):
+        """Expected trip minutes (O(1) table lookup); None for unknown locations."""
+        return self.eta_engine.eta(vehicle_type, start, end, when)
+
+    def _time_trip(self, booking, new_status):
+        now = time.time()
+        if new_status == EN_ROUTE:
+            self._trip_started[booking.id] = now
+            return
+        started = self._trip_started.pop(booking.id, None)
+        if new_status == COMPLETED and started is not None:
+            minutes = (now - started) / 60
+            if self.eta_engine.observe(booking.vehicle_type, booking.start, booking.end, minutes, started):
+                state = self.eta_engine.to_state()
+                if self.writer:
+                    self.writer.submit(write_state, self.eta_file, state)
+                else:
+                    write_state(self.eta_file, state)
+
+    def state_counts(self):
+        """{state: number of hot bookings in it}, without scanning the bookings."""
+        return self.states.counts()
+
+    def _queue_delta(self, delta, log_entry, booking_id, on_saved=None):
+        if self.writer:
+            self.writer.submit(self._persist_delta, delta, log_entry, booking_id, on_done=on_saved)
+        else:
+            self._persist_delta(delta, log_entry, booking_id)
+
+    def _persist_delta(self, delta, log_entry, booking_id):
+        """Worker-side write: the delta record, then the audit log line."""
+        self.deltas.append(delta)
+        self._append_log(log_entry, booking_id)
+        return True
 
 
     def save(self):
-        with open(self.file, "w") as f:
-            json.dump([b.to_dict() for b in self.bookings], f, indent=2)
-
-    def log_to_txt(self, booking, action="Booked"):
-        log_entry = (
+        self._write_snapshot(self._snapshot())
+
+    def save_async(self, on_saved=None):
+        """Queues a save of the current bookings (falls back to a direct save)."""
+        if self.writer:
+            self.writer.submit(self._persist, self._snapshot(), None, on_done=on_saved)
+        else:
+            self.save()
+
+    def _snapshot(self):
+        # Copy now so the worker never sees bookings changing underneath it
+        return [dict(b.to_dict()) for b in self.bookings]
+
+    def _write_snapshot(self, data):
+        tmp_file = self.file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.file)
+        # Everything logged so far is in the snapshot now (the writer runs jobs in order)
+        self.deltas.truncate()
+
+    def _persist(self, data, log_entry=None, booking_id=None):
+        """Worker-side write: snapshot first, then the audit log line."""
+        self._write_snapshot(data)
+        if log_entry:
+            self._append_log(log_entry, booking_id)
+        return True
+
+    def _format_log_entry(self, booking, action="Booked"):
+        return (
             f"{action.upper()} | ID: {booking.id} | "
             f"{booking.vehicle_type} | {booking.start} → {booking.end} | "
             f"{booking.distance:.1f} km | ₱{booking.cost:.2f} | "
             f"{booking.payment_method} | STATUS: {booking.status}\n"
         )
-        with open("booking_log.txt", "a", encoding="utf-8") as log_file:  # <-- add encoding
-            log_file.write(log_entry)
+
+    def _append_log(self, log_entry, booking_id):
+        self._append_log_lines([(log_entry, booking_id)])
+
+    def _append_log_lines(self, entries):
+        """Appends [(log_entry, booking_id), ...] with one fsync, recording offsets in booking_log.txt.idx."""
+        self.log_index.append_many(entries, fsync=True)
+        if self.log_index.needs_compaction():
+            # On the writer thread when there is one, so no lookup ever waits for it
+            start = time.perf_counter()
+            self.log_index.compact()
+            print(f"DEBUG: Compacted the log index in {time.perf_counter() - start:.2f}s")
+
+    def log_to_txt(self, booking, action="Booked"):
+        self._append_log(self._format_log_entry(booking, action), booking.id)
+
+    def log_many(self, bookings, action="Booked"):
+        """Logs one line per booking with a single append (bulk commits)."""
+        self._append_log_lines([(self._format_log_entry(b, action), b.id) for b in bookings])
+
+    def clear_log(self):
+        self.log_index.clear()
+
+    def log_history(self, booking_id):
+        """Every booking_log.txt line for one booking, read through the offset index."""
+        return self.log_index.lookup(booking_id)
 
     def load(self):
         try:
             with open(self.file, "r") as f:
                 data = json.load(f)
-                self.bookings = [Booking(**d) for d in data]
+                bookings = [Booking(**d) for d in data]
         except:
-            self.bookings = []
-
-    def clear_all(self):
+            bookings = []
         self.bookings = []
-        self.save()
-
+        self._by_id = {}
+        self.states.clear()
+        for booking in bookings:
+            self._track(booking)
+        self._replay_deltas()
+        self.analytics = BookingAnalytics.from_bookings(self.bookings)
+        self.analytics.merge(self.archive.analytics) # Archived bookings still count
+
+    def _replay_deltas(self):
+        """Applies changes logged since the last snapshot. Safe to repeat: stale records are skipped."""
+        for delta in self.deltas.replay():
+            if delta.get("op") == "create":
+                if delta["booking"]["id"] not in self._by_id:
+                    self._track(Booking(**delta["booking"]))
+            elif delta.get("op") == "transition":
+                booking = self._by_id.get(delta["id"])
+                if booking is not None and booking.status == delta["from"]:
+                    booking.status = delta["to"]
+                    self.states.move(booking.id, delta["from"], delta["to"])
+
+    def archive_closed(self, older_than=ARCHIVE_AFTER_SECONDS, on_saved=None):
+        """
+        Moves closed bookings created more than `older_than` seconds ago out
+        of bookings.json into the day-partitioned archive. Returns how many moved.
+        """
+        cutoff = time.time() - older_than
+        moved = [b for b in self.bookings
+                 if b.status in CLOSED_STATUSES and (b.created_at or 0) <= cutoff]
+        if not moved:
+            return 0
+        moved_ids = {b.id for b in moved}
+        self.bookings = [b for b in self.bookings if b.id not in moved_ids]
+        for booking in moved:
+            del self._by_id[booking.id]
+            self.states.remove(booking.id, booking.status)
+        rows = [dict(b.to_dict()) for b in moved]
+        if self.writer:
+            self.writer.submit(self._persist_archive, rows, self._snapshot(), on_done=on_saved)
+        else:
+            self._persist_archive(rows, self._snapshot())
+        print(f"DEBUG: Archived {len(moved)} closed bookings")
+        return len(moved)
+
+    def _persist_archive(self, rows, data):
+        # Archive first: a crash in between leaves a duplicate, never a lost booking
+        self.archive.archive(rows)
+        self._write_snapshot(data)
+        return True
+
+    def history(self, since=None):
+        """Bookings to show in the history list: archived ones since `since` plus everything hot."""
+        return list(self.iter_history(since))
+
+    def iter_history(self, since=None):
+        """Like history(), but archive segments are only opened as the iteration reaches them."""
+        for row in self.archive.query(since, include_undated=since is None):
+            yield Booking(**row)
+        yield from list(self.bookings)
+
+    def find(self, booking_id):
+        """A booking by ID, hot or archived (None if unknown)."""
+        if booking_id in self._by_id:
+            return self._by_id[booking_id]
+        row = self.archive.get(booking_id)
+        return Booking(**row) if row else None
+
+    def clear_all(self, on_saved=None):
+        self.bookings = []
+        self._by_id = {}
+        self.states.clear()
+        self.analytics.reset()
+        if self.writer:
+            # Queued behind any pending writes so an older snapshot can't land last
+            self.writer.submit(self._clear_files, on_done=on_saved)
+        else:
+            self._clear_files()
+
+    def _clear_files(self):
+        self._write_snapshot([])
+        self.clear_log()
+        self.archive.clear()
+        return True
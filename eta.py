@@ -0,0 +1,156 @@
+import os
+import json
+import time
+from array import array
+
+# --- ETA Engine ---
+# Trip times are precomputed for every vehicle type and time-of-day bucket in
+# the same lower-triangle layout as the distance table (row i holds the routes
+# from location i to locations 0..i), so an ETA lookup is an array read. Rows
+# are filled the first time a trip touches them, and the tables grow with the
+# distance table. Completed trips teach the engine: an observed duration moves
+# its own route's estimate (EWMA, kept in a sparse dict of the routes actually
+# driven) and nudges a per-table correction factor that applies to routes
+# nobody has driven yet.
+
+# (first hour, name); a trip falls in the last bucket starting at or before its hour
+TIME_BUCKETS = [(0, "night"), (6, "morning_peak"), (9, "midday"), (16, "evening_peak"), (20, "evening")]
+HOUR_BUCKET = [max(b for b, (first, _) in enumerate(TIME_BUCKETS) if first <= hour) for hour in range(24)]
+
+# Typical door-to-door speeds in km/h per bucket (same order as TIME_BUCKETS)
+DEFAULT_SPEEDS_KMH = {
+    "Enavroom-vroom": (32, 18, 24, 15, 26),
+    "Car (4-seater)": (30, 12, 20, 10, 22),
+    "Car (6-seater)": (28, 11, 19, 9, 21),
+}
+FALLBACK_SPEEDS_KMH = (28, 14, 20, 12, 22) # Vehicle types without their own speeds
+OVERHEAD_MINUTES = 2.0      # Boarding, parking and the last few metres
+ALPHA = 0.2                 # Weight of a new trip in its route's estimate
+FACTOR_ALPHA = 0.05         # Weight of a new trip in its table's correction factor
+PLAUSIBLE_RATIO = (0.25, 4.0) # Trips this far off the estimate are discarded as bad data
+
+
+def time_bucket(when=None):
+    """Index into TIME_BUCKETS for a unix time (default: now, local time)."""
+    return HOUR_BUCKET[time.localtime(when).tm_hour]
+
+
+class _Table:
+    """Base minutes for every location pair, for one vehicle type in one time bucket."""
+    def __init__(self, speed_kmh):
+        self.speed_kmh = speed_kmh
+        self.rows = []             # Row i: array of minutes to locations 0..i; None until first used
+        self.factor = 1.0          # Learned / base, across every route in the table
+
+
+class EtaEngine:
+    def __init__(self, location_ids, distance, speeds=None):
+        self.location_ids = location_ids  # name -> id; shared with the distance table, so it grows with it
+        self.distance = distance          # distance(start, end) in km
+        self.speeds = speeds or DEFAULT_SPEEDS_KMH
+        self.tables = {}                  # (vehicle_type, bucket) -> _Table, made on first use
+        self.learned = {}                 # (vehicle_type, bucket, i, j) with i >= j -> EWMA minutes of completed trips
+        self.observations = 0
+        self._names = []                  # id -> name
+
+    def _table(self, vehicle_type, bucket):
+        table = self.tables.get((vehicle_type, bucket))
+        if table is None:
+            table = _Table(self.speeds.get(vehicle_type, FALLBACK_SPEEDS_KMH)[bucket])
+            self.tables[(vehicle_type, bucket)] = table
+        return table
+
+    def _key(self, vehicle_type, bucket, start, end):
+        i = self.location_ids.get(start)
+        j = self.location_ids.get(end)
+        if i is None or j is None:
+            return None
+        return (vehicle_type, bucket, i, j) if i >= j else (vehicle_type, bucket, j, i)
+
+    def _row(self, table, i):
+        """Row i of the table, computing it from the distance table on first use."""
+        if i >= len(table.rows):
+            table.rows.extend([None] * (len(self.location_ids) - len(table.rows))) # New locations
+        row = table.rows[i]
+        if row is None:
+            if len(self._names) != len(self.location_ids):
+                self._names = sorted(self.location_ids, key=self.location_ids.get)
+            start = self._names[i]
+            row = array("d", (OVERHEAD_MINUTES + self.distance(start, end) / table.speed_kmh * 60
+                              for end in self._names[:i]))
+            row.append(0.0)
+            table.rows[i] = row
+        return row
+
+    def _base(self, table, key):
+        return self._row(table, key[2])[key[3]]
+
+    def eta(self, vehicle_type, start, end, when=None):
+        """Minutes from start to end for a trip starting at `when`; None for unknown locations."""
+        if start == end:
+            return 0.0
+        bucket = time_bucket(when)
+        key = self._key(vehicle_type, bucket, start, end)
+        if key is None:
+            return None
+        learned = self.learned.get(key)
+        if learned is not None:
+            return learned
+        table = self._table(vehicle_type, bucket)
+        return self._base(table, key) * table.factor
+
+    def observe(self, vehicle_type, start, end, minutes, when=None):
+        """Learns from one completed trip; False if it was discarded."""
+        expected = self.eta(vehicle_type, start, end, when)
+        if not expected or not PLAUSIBLE_RATIO[0] <= minutes / expected <= PLAUSIBLE_RATIO[1]:
+            return False
+        bucket = time_bucket(when)
+        table = self._table(vehicle_type, bucket)
+        key = self._key(vehicle_type, bucket, start, end)
+        self.learned[key] = expected + ALPHA * (minutes - expected)
+        table.factor += FACTOR_ALPHA * (minutes / self._base(table, key) - table.factor)
+        self.observations += 1
+        return True
+
+    # -- persistence (only what was learned; the base tables are always recomputed) --
+    def to_state(self):
+        names = {loc_id: name for name, loc_id in self.location_ids.items()}
+        tables = {}
+        for (vehicle_type, bucket), table in self.tables.items():
+            if table.factor != 1.0:
+                tables.setdefault(vehicle_type, {})[TIME_BUCKETS[bucket][1]] = {"factor": table.factor, "learned": []}
+        for (vehicle_type, bucket, i, j), minutes in self.learned.items():
+            saved = tables.setdefault(vehicle_type, {}).setdefault(
+                TIME_BUCKETS[bucket][1], {"factor": self._table(vehicle_type, bucket).factor, "learned": []})
+            saved["learned"].append([names[i], names[j], minutes])
+        return {"observations": self.observations, "tables": tables}
+
+    def load_state(self, state):
+        bucket_ids = {name: b for b, (_, name) in enumerate(TIME_BUCKETS)}
+        self.observations = state.get("observations", 0)
+        for vehicle_type, buckets in state.get("tables", {}).items():
+            for bucket_name, saved in buckets.items():
+                if bucket_name not in bucket_ids:
+                    continue
+                bucket = bucket_ids[bucket_name]
+                self._table(vehicle_type, bucket).factor = saved.get("factor", 1.0)
+                for start, end, minutes in saved.get("learned", []):
+                    key = self._key(vehicle_type, bucket, start, end)
+                    if key is not None:
+                        self.learned[key] = minutes
+
+    def load(self, path):
+        try:
+            with open(path, "r") as f:
+                self.load_state(json.load(f))
+        except (OSError, ValueError) as e:
+            if os.path.exists(path):
+                print(f"DEBUG: ETA state unreadable ({path}): {e}. Starting from default speeds.")
+
+
+def write_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+    return True
@@ -1,9 +1,18 @@
 from tkinter import Tk
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageDraw, ImageFont
 import os
-from bookingsystem import Booking, BookingSystem, get_distance, LOCATIONS, DISTANCE_MATRIX, ROUTE_IMAGE_MAP 
+import time
+from datetime import datetime
+from asset_cache import AssetCache, transform_image
+from asset_bundle import AssetBundle
+from background import BackgroundWorker
+from stall_monitor import StallMonitor, install_callback_tracing
+from route_renderer import RouteRenderer
+from tracking import SimulatedGPSFeed, TrackInterpolator, CanvasProjection, FRAME_MS
+from lifecycle import MATCHED, EN_ROUTE, COMPLETED, CANCELLED, InvalidTransition
+from scheduler import Scheduler, HIGH, LOW
+from bookingsystem import Booking, BookingSystem, ARCHIVE_CHECK_SECONDS, get_distance, LOCATIONS, DISTANCE_MATRIX, ROUTE_IMAGE_MAP, LOCATION_REGISTRY
 
 PURPLE_DARK = "#360042"
 HIGHLIGHT_COLOR = "#6A0DAD"
@@ -25,11 +34,35 @@ _image_references = {}
 
 
 IMAGE_BASE_PATH = os.path.join(os.path.expanduser('~'), 'enavroom_assets')
+BUNDLE_PATH = os.path.join(IMAGE_BASE_PATH, 'bundle') # Built by asset_bundle.py
+HISTORY_DAYS = 30 # Archived bookings older than this are left out of the history page
+TRACKING_MAP_SIZE = (335, 150)
+TRACKING_SECONDS = 4.0 # Simulated trip length; the sprite lands about a second later
+
+_asset_cache = None
+_asset_bundle = None
+
+def get_asset_cache():
+    """Returns the shared derived-asset cache, scanning IMAGE_BASE_PATH on first use."""
+    global _asset_cache
+    if _asset_cache is None:
+        _asset_cache = AssetCache(IMAGE_BASE_PATH)
+    return _asset_cache
+
+def get_asset_bundle():
+    """Returns the packed icon atlas / map container, opening its index on first use."""
+    global _asset_bundle
+    if _asset_bundle is None:
+        _asset_bundle = AssetBundle(BUNDLE_PATH)
+    return _asset_bundle
 
 def load_image(filename, size=None, is_circular=False, fill_color=(200, 200, 200)):
     """
     Loads an image, optionally resizes it, and can make it circular.
     Uses a global dictionary to keep references.
+    Icons and maps are served from the packed asset bundle when it is up to date;
+    other resized/masked results are kept in the on-disk asset cache, so warm
+    starts load a ready-made PNG straight into Tk.
     Provides a placeholder if the image is not found or fails to load.
     """
     filepath = os.path.join(IMAGE_BASE_PATH, filename)
@@ -38,26 +71,34 @@ def load_image(filename, size=None, is_circular=False, fill_color=(200, 200, 200
     if img_key in _image_references:
         return _image_references[img_key]
 
+    asset_cache = get_asset_cache()
+    asset_bundle = get_asset_bundle()
+    if asset_bundle.is_fresh(filename, asset_cache.sources.get(filename)):
+        photo = asset_bundle.get(filename, size, is_circular)
+        if photo:
+            _image_references[img_key] = photo
+            return photo
+
+    cached_path = asset_cache.get(filename, size, is_circular)
+    if cached_path:
+        try:
+            photo = tk.PhotoImage(file=cached_path)
+            _image_references[img_key] = photo
+            return photo
+        except tk.TclError as e:
+            print(f"DEBUG: Cached asset unreadable ({cached_path}): {e}. Rebuilding.")
+
+    # Cache miss: only now is PIL worth importing
+    from PIL import Image, ImageTk, ImageDraw, ImageFont
     pil_img = None
     try:
-        if os.path.exists(filepath):
-            pil_img = Image.open(filepath)
-            if size:
-                pil_img = pil_img.resize(size, Image.LANCZOS)
+        if asset_cache.exists(filename):
+            pil_img = transform_image(filepath, size, is_circular)
+            asset_cache.put(filename, size, is_circular, pil_img)
         else:
             print(f"DEBUG: Image file not found: {filepath}. Creating placeholder.")
             raise FileNotFoundError # Trigger fallback to placeholder creation
 
-        if is_circular:
-            # Create a circular image
-            mask = Image.new('L', pil_img.size, 0)
-            draw = ImageDraw.Draw(mask)
-            draw.ellipse((0, 0) + pil_img.size, fill=255)
-            # Apply mask to the image, assuming RGBA for transparency
-            if pil_img.mode != 'RGBA':
-                pil_img = pil_img.convert('RGBA')
-            pil_img.putalpha(mask)
-
     except (FileNotFoundError, Exception) as e:
         # print(f"ERROR: Could not load or process image {filepath}: {e}. Creating fallback placeholder.")
         if size is None: size = (50, 50) # Default size for placeholder if not provided
@@ -91,6 +132,11 @@ def load_image(filename, size=None, is_circular=False, fill_color=(200, 200, 200
 
 class App(tk.Tk):
     def __init__(self):
+        # Event-loop health monitor; installed first so every callback is traced
+        self.stall_monitor = None
+        if os.environ.get("ENAVROOM_STALL_MONITOR", "1") != "0":
+            self.stall_monitor = StallMonitor(self)
+            install_callback_tracing(self.stall_monitor)
         super().__init__()
         self.title("Enavroom App")
         self.geometry("375x667") # Typical mobile app size
@@ -100,6 +146,17 @@ class App(tk.Tk):
         self.frames = {}
         self.booking_system = BookingSystem("bookings.json")  # Initialize booking system with file
         self.booking_system.load() # Load existing bookings from file
+        # Saves and log appends run on a worker thread so button handlers never block on disk
+        self.writer = BackgroundWorker(self, name="enavroom-writer")
+        self.booking_system.writer = self.writer
+        # Route maps without a pre-made image are drawn on their own worker
+        self.route_renderer = RouteRenderer(LOCATION_REGISTRY, IMAGE_BASE_PATH)
+        self.render_worker = BackgroundWorker(self, name="enavroom-renderer")
+        # The workers are daemon threads: closing the window must not drop queued writes
+        self.protocol("WM_DELETE_WINDOW", self.shutdown)
+        # Timers and long UI work run as time-sliced tasks on the event loop
+        self.scheduler = Scheduler(self, monitor=self.stall_monitor)
+        self.current_page = None
 
         
         # State variables to pass data between pages
@@ -128,28 +185,104 @@ class App(tk.Tk):
             self.frames[page_name] = frame
             frame.grid(row=0, column=0, sticky="nsew")
 
+        # Closed bookings move to the archive on the first idle slice after startup, then hourly
+        self.scheduler.every(ARCHIVE_CHECK_SECONDS * 1000, self.booking_system.archive_closed, priority=LOW,
+                             name="archive-closed")
+        # New cache entries from building the pages are recorded in one manifest write; later misses every 30 s
+        self.scheduler.every(30000, get_asset_cache().flush, priority=LOW, name="asset-manifest")
+
+        # Opt-in session recording (ENAVROOM_TRACE=file), replayed by session_trace.py as a perf test
+        self.recorder = None
+        if os.environ.get("ENAVROOM_TRACE"):
+            from session_trace import SessionRecorder
+            self.recorder = SessionRecorder(os.environ["ENAVROOM_TRACE"])
+            self.recorder.attach(self)
+
         self.show_frame("StartPage") # Start with the StartPage
 
+        # Hidden key binding: memory report (bookings, cached images, widgets per page)
+        self.memory_profiler = None
+        self.bind("<Control-Shift-M>", lambda e: self.dump_memory())
+        # ENAVROOM_MEMORY_SNAPSHOT_MIN=N also records a snapshot every N minutes, so reports show growth over time
+        snapshot_min = float(os.environ.get("ENAVROOM_MEMORY_SNAPSHOT_MIN", "0") or 0)
+        if snapshot_min > 0:
+            self.scheduler.every(int(snapshot_min * 60000), lambda: self._memory_profiler().snapshot(),
+                                 priority=LOW, name="memory-snapshot")
+
+        if self.stall_monitor:
+            # Hidden key binding: dump the worst event-loop stalls
+            self.bind("<Control-Shift-S>", lambda e: self.stall_monitor.dump())
+            self.stall_monitor.start()
+
     def show_frame(self, page_name):
         """Shows a frame for the given page name and updates its content if needed."""
         frame = self.frames[page_name]
+        previous = self.frames.get(self.current_page)
+        if previous is not None and previous is not frame and hasattr(previous, 'on_hide'):
+            previous.on_hide() # Stop the old page's timers and tasks
+        self.current_page = page_name
+        if self.stall_monitor:
+            self.stall_monitor.page = page_name
         # Call an update method on the frame if it exists and is needed
         if hasattr(frame, 'on_show'):
-            frame.on_show()
+            if self.stall_monitor:
+                with self.stall_monitor.watch(f"{page_name}.on_show"):
+                    frame.on_show()
+            else:
+                frame.on_show()
         frame.tkraise()
         print(f"DEBUG: Showing frame: {page_name}")
 
+    def _memory_profiler(self):
+        if self.memory_profiler is None:
+            from memory_report import MemoryProfiler
+            # Periodic snapshots keep tracemalloc running so growth is attributed by line
+            keep_tracing = float(os.environ.get("ENAVROOM_MEMORY_SNAPSHOT_MIN", "0") or 0) > 0
+            self.memory_profiler = MemoryProfiler(self, image_references=_image_references,
+                                                  keep_tracing=keep_tracing)
+        return self.memory_profiler
+
+    def dump_memory(self):
+        """Prints a memory report and writes it to memory_report.json."""
+        self._memory_profiler().dump()
+
     def exit_app(self):
         """Prompts user and exits the application."""
         if messagebox.askyesno("Exit", "Are you sure you want to exit?"):
-            self.booking_system.save()
-            self.destroy()
+            self.shutdown()
+
+    def shutdown(self):
+        """Lets queued writes land, stops the workers and closes the window."""
+        self.scheduler.cancel_all() # No new archive/manifest jobs behind the final save
+        self.writer.stop() # Runs everything already queued first
+        self.render_worker.stop()
+        self.booking_system.writer = None
+        get_asset_cache().flush()
+        self.booking_system.save()
+        self.destroy()
 
     def update_booking_details(self, **kwargs):
         """Updates the current booking details dictionary."""
         self.current_booking_details.update(kwargs)
         print(f"DEBUG: Booking details updated: {self.current_booking_details}")
 
+    def advance_booking(self, status):
+        """Moves the current booking along its lifecycle (persisted as a small delta)."""
+        booking_id = self.current_booking_details.get("booking_id")
+        if not booking_id:
+            return
+        try:
+            self.booking_system.transition(booking_id, status, on_saved=self.on_booking_saved)
+        except (KeyError, InvalidTransition) as e:
+            print(f"DEBUG: Booking {booking_id} not moved to {status}: {e}")
+
+    def on_booking_saved(self, result, error):
+        """Completion callback for queued booking writes (runs on the UI thread)."""
+        if error:
+            messagebox.showwarning("Save Failed", f"Your booking change could not be saved:\n{error}")
+        else:
+            print("DEBUG: Booking changes saved to disk.")
+
 # --- Common Helper for Binding Widgets Recursively ---
 def bind_widgets_recursively(widget, func):
     """Binds a function to a widget and all its children."""
@@ -366,6 +499,7 @@ class HistoryPage(tk.Frame):
 
         self.history_list_frame = tk.Frame(self, bg=WHITE, bd=1, relief="solid")
         self.history_list_frame.pack(fill="both", expand=True, padx=20, pady=20)
+        self.rebuild_task = None # Scheduler task filling in the rows
 
         clear_button = tk.Button(self, text="Clear History", font=FONT_BUTTON,
         command=self.clear_history,
@@ -377,8 +511,7 @@ class HistoryPage(tk.Frame):
         
     def clear_history(self):
         if messagebox.askyesno("Clear All History", "Are you sure you want to delete all booking history?"):
-            self.controller.booking_system.clear_all()
-            open("booking_log.txt", "w").close()
+            self.controller.booking_system.clear_all(on_saved=self.controller.on_booking_saved) # Also clears the .txt log
             self.update_history_display()
             messagebox.showinfo("Cleared", "All booking history has been cleared.")
 
@@ -404,38 +537,54 @@ class HistoryPage(tk.Frame):
     def on_show(self):
         """Called when the frame is shown."""
         self.update_history_display()
+
+    def on_hide(self):
+        if self.rebuild_task:
+            self.rebuild_task.cancel()
     
         
     def update_history_display(self):
+        """Rebuilds the list a row per scheduler step, so a long history never blocks input."""
+        if self.rebuild_task:
+            self.rebuild_task.cancel()
         # Clear previous history entries
         for widget in self.history_list_frame.winfo_children():
             widget.destroy()
 
-        bookings = self.controller.booking_system.bookings
-        if not bookings:
-            tk.Label(self.history_list_frame, text="No past bookings yet.", font=FONT_NORMAL, bg=WHITE, fg=TEXT_COLOR).pack(pady=20)
-            return
+        # Archived days are decompressed inside the task as the rows reach them, not up front
+        bookings = self.controller.booking_system.iter_history(since=time.time() - HISTORY_DAYS * 24 * 60 * 60)
+        self.rebuild_task = self.controller.scheduler.spawn(self._build_rows(bookings), priority=HIGH,
+                                                            name="HistoryPage.rebuild")
 
+    def _build_rows(self, bookings):
+        i = -1
         for i, booking in enumerate(bookings):
+            # Add a separator
+            if i > 0:
+                ttk.Separator(self.history_list_frame, orient="horizontal").pack(fill="x", padx=5, pady=5)
 
-            if booking.status == "cancelled":
+            if booking.status == CANCELLED:
                 bg_color = "#eb868f" #red for cancelled bookings
-    
+            elif booking.status == COMPLETED:
+                bg_color = "#6ce989" #green for finished rides
             else:
-                bg_color = "#6ce989" #if i % 2 == 0 else WHITE
+                bg_color = "#f5d77a" #yellow while the ride is still in progress
             
             booking_frame = tk.Frame(self.history_list_frame, bg=bg_color, bd=1, relief="groove")
             booking_frame.pack(fill="x", padx=5, pady=2)
    
             tk.Label(booking_frame, text=f"Booking ID: {booking.id}", font=FONT_SUBTITLE, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
+            if booking.created_at:
+                booked_on = datetime.fromtimestamp(booking.created_at).strftime("%b %d, %Y %I:%M %p")
+                tk.Label(booking_frame, text=f"Booked: {booked_on}", font=FONT_NORMAL, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
+            tk.Label(booking_frame, text=f"Status: {booking.status.replace('_', ' ').title()}", font=FONT_NORMAL, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
             tk.Label(booking_frame, text=f"Vehicle: {booking.vehicle_type}", font=FONT_NORMAL, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
             tk.Label(booking_frame, text=f"Route: {booking.start} to {booking.end}", font=FONT_NORMAL, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
             tk.Label(booking_frame, text=f"Distance: {booking.distance:.1f} km", font=FONT_NORMAL, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
             tk.Label(booking_frame, text=f"Cost: ₱{booking.cost:.2f} ({booking.payment_method})", font=FONT_NORMAL, bg=bg_color, fg=TEXT_COLOR, anchor="w").pack(fill="x")
-            
-            # Add a separator
-            if i < len(bookings) - 1:
-                ttk.Separator(self.history_list_frame, orient="horizontal").pack(fill="x", padx=5, pady=5)
+            yield
+        if i < 0:
+            tk.Label(self.history_list_frame, text="No past bookings yet.", font=FONT_NORMAL, bg=WHITE, fg=TEXT_COLOR).pack(pady=20)
 
 class BookEnavroomPage(tk.Frame):
     def __init__(self, parent, controller):
@@ -465,7 +614,7 @@ class BookEnavroomPage(tk.Frame):
         self.vehicle_option_frames = [] # Still keeping this for selection logic, but only one option for Enavroom
 
         vehicle_config = {"type": "Enavroom-vroom", "icon": "enavroom.png", "title": "Enavroom-vroom", "passengers": "1", "description": "Beat the traffic on a motorcycle ride."}
-        calculated_price = self.controller.booking_system.calculate_cost(vehicle_config["type"], self.trip_distance)
+        _, calculated_price = self.controller.booking_system.quote(vehicle_config["type"], self.pickup_location_display, self.dropoff_location_display)
         option_data = {
             "icon": vehicle_config["icon"],
             "title": vehicle_config["title"],
@@ -582,7 +731,8 @@ class BookEnavroomPage(tk.Frame):
         print(f"Selected payment method: {method}")
 
     def _on_book_now(self):
-        final_cost = self.controller.booking_system.calculate_cost(self.selected_vehicle_type, self.trip_distance)
+        _, final_cost = self.controller.booking_system.quote(self.selected_vehicle_type,
+                                                             self.pickup_location_display, self.dropoff_location_display)
         self.controller.update_booking_details(
             vehicle_type=self.selected_vehicle_type,
             pickup_location=self.pickup_location_display,
@@ -634,7 +784,7 @@ class BookEnacarPage(tk.Frame):
         ]
 
         for config in vehicle_configs:
-            calculated_price = self.controller.booking_system.calculate_cost(config["type"], self.trip_distance)
+            _, calculated_price = self.controller.booking_system.quote(config["type"], self.pickup_location_display, self.dropoff_location_display)
             option_data = {
                 "icon": config["icon"],
                 "title": config["title"],
@@ -751,7 +901,8 @@ class BookEnacarPage(tk.Frame):
         print(f"Selected payment method: {method}")
 
     def _on_book_now(self):
-        final_cost = self.controller.booking_system.calculate_cost(self.selected_vehicle_type, self.trip_distance)
+        _, final_cost = self.controller.booking_system.quote(self.selected_vehicle_type,
+                                                             self.pickup_location_display, self.dropoff_location_display)
         self.controller.update_booking_details(
             vehicle_type=self.selected_vehicle_type,
             pickup_location=self.pickup_location_display,
@@ -856,8 +1007,7 @@ class PUandDOPage(tk.Frame):
         dropoff = self.dropoff_var.get()
         vehicle_type = self.controller.current_booking_details.get("vehicle_type", "Enavroom-vroom") # Default if not set
 
-        distance = get_distance(pickup, dropoff)
-        cost = self.controller.booking_system.calculate_cost(vehicle_type, distance)
+        distance, cost = self.controller.booking_system.quote(vehicle_type, pickup, dropoff)
         self.cost_label.config(text=f"Estimated Cost: ₱{cost:.2f}")
 
         # Update controller's booking details
@@ -941,18 +1091,47 @@ class MapPage(tk.Frame):
         cost = details.get('cost')
 
         # Determine map image based on pickup/dropoff
-        image_name = ROUTE_IMAGE_MAP.get((pickup, dropoff), "default_map.png")
-        map_img = load_image(image_name, (375, 300))
-
-        if map_img:
+        image_name = ROUTE_IMAGE_MAP.get((pickup, dropoff))
+        if image_name:
+            map_img = load_image(image_name, (375, 300))
             self.map_label.configure(image=map_img)
             self.map_label.image = map_img
         else:
-            self.map_label.configure(text=f"No map for route\n({pickup} → {dropoff})", image='', font=("Arial", 12), fg="gray")
+            self._show_rendered_route(pickup, dropoff)
 
         self.route_label.config(text=f"From: {pickup}\nTo: {dropoff}\nDistance: {distance:.1f} km")
         self.cost_label.config(text=f"Total Cost: ₱{cost:.2f}")
 
+    def _show_rendered_route(self, pickup, dropoff):
+        # No pre-made image for this pair: draw it on the base map in the background
+        renderer = self.controller.route_renderer
+        if not renderer.can_render(pickup, dropoff):
+            self.map_label.configure(text=f"No map for route\n({pickup} → {dropoff})", image='', font=("Arial", 12), fg="gray")
+            return
+        path = renderer.cached_path(pickup, dropoff)
+        if path:
+            self._set_route_image(pickup, dropoff, path, None)
+            return
+        self.map_label.configure(text="Drawing route map...", image='', font=("Arial", 12), fg="gray")
+        self.controller.render_worker.submit(
+            renderer.render, pickup, dropoff,
+            on_done=lambda path, error: self._set_route_image(pickup, dropoff, path, error))
+
+    def _set_route_image(self, pickup, dropoff, path, error):
+        details = self.controller.current_booking_details
+        if (details.get('pickup_location'), details.get('dropoff_location')) != (pickup, dropoff):
+            return # The user already picked another route
+        if error:
+            self.map_label.configure(text=f"No map for route\n({pickup} → {dropoff})", image='', font=("Arial", 12), fg="gray")
+            return
+        img_key = f"route:{path}"
+        map_img = _image_references.get(img_key)
+        if map_img is None:
+            map_img = tk.PhotoImage(file=path)
+            _image_references[img_key] = map_img
+        self.map_label.configure(image=map_img, text='')
+        self.map_label.image = map_img
+
     def _on_book_now(self):
         # map.py -> loading_page.py
         self.controller.show_frame("LoadingPage")
@@ -968,7 +1147,8 @@ class LoadingPage(tk.Frame):
 
         # Simple animation for loading dots
         self.dots_count = 0
-        self.after_id = None # To store the after method ID for cancellation
+        self.animation_task = None # Scheduler tasks, cancelled when the page is left
+        self.transition_task = None
 
         cancel_button = tk.Button(self, text="Cancel Booking", command=self._on_cancel_booking,
                                    font=FONT_BUTTON, bg=RED_COLOR, fg=WHITE,
@@ -976,31 +1156,29 @@ class LoadingPage(tk.Frame):
         cancel_button.pack(pady=30)
 
     def on_show(self):
+        self.on_hide() # Cancel any previous animation / pending transition
         self.dots_count = 0
-        self._animate_loading()
-        # Schedule the transition after a delay (e.g., 3 seconds)
-        # Cancel any previous pending transition
-        if hasattr(self, 'transition_id') and self.transition_id:
-            self.after_cancel(self.transition_id)
-        self.transition_id = self.after(3000, self._transition_to_driver_found) # 3 seconds delay
+        scheduler = self.controller.scheduler
+        self.animation_task = scheduler.every(500, self._animate_loading) # Update every 500ms
+        self.transition_task = scheduler.call_later(3000, self._transition_to_driver_found) # 3 seconds delay
 
     def on_hide(self):
         # Stop animation when leaving the page
-        if self.after_id:
-            self.after_cancel(self.after_id)
-            self.after_id = None
-        if hasattr(self, 'transition_id') and self.transition_id:
-            self.after_cancel(self.transition_id)
-            self.transition_id = None
+        if self.animation_task:
+            self.animation_task.cancel()
+            self.animation_task = None
+        if self.transition_task:
+            self.transition_task.cancel()
+            self.transition_task = None
 
     def _animate_loading(self):
         self.dots_count = (self.dots_count + 1) % 4
         dots = "." * self.dots_count
         self.loading_label.config(text=f"Finding a driver{dots}")
-        self.after_id = self.after(500, self._animate_loading) # Update every 500ms
 
     def _transition_to_driver_found(self):
         self.on_hide() # Stop animation and pending transitions
+        self.controller.advance_booking(MATCHED)
         vehicle_type = self.controller.current_booking_details.get("vehicle_type")
         if "Car" in vehicle_type:
             self.controller.show_frame("WeFoundDriverEnacarPage")
@@ -1010,7 +1188,7 @@ class LoadingPage(tk.Frame):
     def _on_cancel_booking(self):
         # cancel booking -> home_page.py
         booking_id = self.controller.current_booking_details.get("booking_id")
-        if booking_id and self.controller.booking_system.cancel(booking_id):
+        if booking_id and self.controller.booking_system.cancel(booking_id, on_saved=self.controller.on_booking_saved):
             messagebox.showinfo("Cancelled", "Your booking has been cancelled.")
         else:
             messagebox.showwarning("Error", "Could not cancel booking or no active booking found.")
@@ -1042,14 +1220,35 @@ class WeFoundDriverBasePage(tk.Frame):
 
         tk.Label(self, text="Driver Name: John Doe", font=FONT_BODY, bg=GRAY_LIGHT, fg=TEXT_COLOR).pack(pady=5)
         tk.Label(self, text="Plate No: ABC 123", font=FONT_BODY, bg=GRAY_LIGHT, fg=TEXT_COLOR).pack(pady=5)
-        tk.Label(self, text="ETA: 5 mins", font=FONT_BODY, bg=GRAY_LIGHT, fg=TEXT_COLOR).pack(pady=5)
+        self.eta_label = tk.Label(self, text="ETA: --", font=FONT_BODY, bg=GRAY_LIGHT, fg=TEXT_COLOR)
+        self.eta_label.pack(pady=5)
+
+        # Live tracking map: every canvas item is created once here; the animation only moves them
+        width, height = TRACKING_MAP_SIZE
+        self.map_canvas = tk.Canvas(self, width=width, height=height, bg="#EBEBE4", highlightthickness=0)
+        self.map_canvas.pack(pady=5)
+        for x in range(0, width, 40):
+            self.map_canvas.create_line(x, 0, x, height, fill=WHITE, width=3)
+        for y in range(0, height, 40):
+            self.map_canvas.create_line(0, y, width, y, fill=WHITE, width=3)
+        self.route_item = self.map_canvas.create_line(0, 0, 0, 0, fill=HIGHLIGHT_COLOR, width=4)
+        self.pickup_item = self.map_canvas.create_oval(0, 0, 0, 0, fill="#0059FF", outline=WHITE, width=2)
+        self.dropoff_item = self.map_canvas.create_oval(0, 0, 0, 0, fill=RED_COLOR, outline=WHITE, width=2)
+        sprite = load_image(self.driver_icon, (28, 28), is_circular=True)
+        self.driver_item = self.map_canvas.create_image(0, 0, image=sprite)
+        self.map_canvas.sprite = sprite
+        self.feed = None
+        self.track = None
+        self.projection = None
+        self._driver_xy = None
 
         self.cancel_button = tk.Button(self, text="Cancel Ride", command=self._on_cancel_ride,
                                          font=FONT_BUTTON, bg=RED_COLOR, fg=WHITE,
                                          padx=20, pady=10, relief="raised", bd=0, cursor="hand2")
         self.cancel_button.pack(pady=(20, 10))
 
-        self.after_id_transition = None # To hold transition to DonePage
+        self.transition_task = None # Scheduler task for the transition to DonePage
+        self.tracking_task = None   # Scheduler task animating the driver on the map
 
     def _create_header(self, title, back_command):
         header_frame = tk.Frame(self, bg=PURPLE_DARK, height=50)
@@ -1063,20 +1262,68 @@ class WeFoundDriverBasePage(tk.Frame):
         cancel_btn.place(relx=0.9, rely=0.5, anchor="center") # Top right corner
 
     def on_show(self):
-        # Automatically transition to DonePage after a delay
-        if self.after_id_transition:
-            self.after_cancel(self.after_id_transition)
-        self.after_id_transition = self.after(5000, self._transition_to_done) # 5 seconds delay to done page
+        # Track the driver along the route and go to DonePage when they arrive
+        self.on_hide()
+        self.controller.advance_booking(EN_ROUTE) # Driver is on the way
+        details = self.controller.current_booking_details
+        minutes = self.controller.booking_system.eta(details.get("vehicle_type"), details.get("pickup_location"),
+                                                     details.get("dropoff_location"))
+        self.eta_label.config(text=f"ETA: {max(1, round(minutes))} mins" if minutes is not None else "ETA: --")
+        if not self._start_tracking():
+            self.transition_task = self.controller.scheduler.call_later(5000, self._transition_to_done) # 5 seconds delay to done page
 
     def on_hide(self):
-        if self.after_id_transition:
-            self.after_cancel(self.after_id_transition)
-            self.after_id_transition = None
+        if self.transition_task:
+            self.transition_task.cancel()
+            self.transition_task = None
+        if self.tracking_task:
+            self.tracking_task.cancel()
+            self.tracking_task = None
+
+    def _start_tracking(self):
+        """Places the route on the map and starts the animation; False when the route has no coordinates."""
+        details = self.controller.current_booking_details
+        pickup = LOCATION_REGISTRY.get(details.get("pickup_location"))
+        dropoff = LOCATION_REGISTRY.get(details.get("dropoff_location"))
+        if pickup is None or dropoff is None:
+            self.map_canvas.pack_forget()
+            return False
+        self.map_canvas.pack(pady=5, before=self.cancel_button)
+        start, end = (pickup.lat, pickup.lon), (dropoff.lat, dropoff.lon)
+        self.projection = CanvasProjection([start, end], *TRACKING_MAP_SIZE)
+        (ax, ay), (bx, by) = self.projection.project(*start), self.projection.project(*end)
+        self.map_canvas.coords(self.route_item, ax, ay, bx, by)
+        self.map_canvas.coords(self.pickup_item, ax - 7, ay - 7, ax + 7, ay + 7)
+        self.map_canvas.coords(self.dropoff_item, bx - 7, by - 7, bx + 7, by + 7)
+        self._driver_xy = None
+        self._move_driver(ax, ay)
+
+        self.feed = SimulatedGPSFeed(start, end, TRACKING_SECONDS)
+        self.track = TrackInterpolator(self.feed.fix_interval_s)
+        self.tracking_task = self.controller.scheduler.every(FRAME_MS, self._update_tracking, name="driver-tracking")
+        return True
+
+    def _update_tracking(self):
+        for fix in self.feed.poll():
+            self.track.push(*fix)
+        now = self.feed.elapsed()
+        position = self.track.position(now)
+        if position:
+            self._move_driver(*self.projection.project(*position))
+        if self.feed.finished and self.track.caught_up(now):
+            self._transition_to_done() # Driver has arrived
+
+    def _move_driver(self, x, y):
+        # Skip frames where the sprite would not visibly move, so a waiting driver costs no redraws
+        if self._driver_xy and abs(x - self._driver_xy[0]) < 0.5 and abs(y - self._driver_xy[1]) < 0.5:
+            return
+        self.map_canvas.coords(self.driver_item, x, y)
+        self._driver_xy = (x, y)
 
     def _on_cancel_ride(self):
         # If cancel button clicked -> HomePage
         booking_id = self.controller.current_booking_details.get("booking_id")
-        if booking_id and self.controller.booking_system.cancel(booking_id):
+        if booking_id and self.controller.booking_system.cancel(booking_id, on_saved=self.controller.on_booking_saved):
             messagebox.showinfo("Ride Cancelled", "Your ride has been cancelled.")
         else:
             messagebox.showwarning("Error", "Could not cancel ride or no active booking found.")
@@ -1131,12 +1378,11 @@ class DonePage(tk.Frame):
         # Display final booking details
         details = self.controller.current_booking_details
         booking_id = details.get("booking_id")
+        self.controller.advance_booking(COMPLETED)
 
     def clear_history(self):
         if messagebox.askyesno("Clear All History", "Are you sure you want to delete all booking history?"):
-            self.controller.booking_system.clear_all()
-            # Also clear the .txt log
-            open("booking_log.txt", "w").close()
+            self.controller.booking_system.clear_all(on_saved=self.controller.on_booking_saved) # Also clears the .txt log
             self.update_history_display()
             messagebox.showinfo("Cleared", "All booking history has been cleared.")
 
@@ -1156,6 +1402,7 @@ class DonePage(tk.Frame):
 
 # --- Main execution block ---
 if __name__ == "__main__":
+    from PIL import Image, ImageDraw, ImageFont # Only for generating the dummy assets below
     # Define dummy image files and their sizes for automatic creation
     # Make sure these names match the ones used in the UI code
     dummy_images = {
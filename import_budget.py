@@ -0,0 +1,81 @@
+import os
+import sys
+import argparse
+import subprocess
+
+# --- Import-Time Budget ---
+# Imports each entry module in a fresh interpreter with `-X importtime` and
+# reports what it pulled in and how long that took. Headless modules must
+# stay clear of the GUI stack, and every module has a time budget; the exit
+# code is non-zero when either is broken, so this can run as a check.
+
+GUI_MODULES = {"tkinter", "_tkinter", "PIL", "gui"}
+
+# module -> (budget in ms, may it import the GUI stack?)
+BUDGETS = {
+    "bookingsystem": (60, False),
+    "booking_io": (60, False),
+    "batch": (80, False),
+    "sharding": (80, False),
+    "storage": (40, False),
+    "log_index": (40, False),
+    "memory_report": (40, False),
+    "session_trace": (40, False),
+    "main": (20, False),   # Entry point: must not pay for the GUI before deciding to launch it
+    "gui": (150, True),    # PIL is deferred to cache misses, so it is not counted here
+}
+
+
+def measure(module, cwd=None):
+    """[(cumulative us, self us, dotted name, depth), ...] for one `import module` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:       412 |        981 |   encodings.aliases"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), name.strip(), depth))
+    return rows
+
+
+def check(module, budget_ms, allow_gui, top=8, cwd=None):
+    """Prints the module's import report and returns a list of problems (empty when within budget)."""
+    rows = measure(module, cwd)
+    total = next((cum for cum, _, name, _ in rows if name == module), sum(self_us for _, self_us, _, _ in rows))
+    problems = []
+    print(f"{module}: {total / 1000:.1f} ms (budget {budget_ms} ms)")
+    for cumulative, self_us, name, depth in sorted(rows, reverse=True)[:top]:
+        print(f"    {cumulative / 1000:8.1f} ms cumulative {self_us / 1000:7.1f} ms self  {name}")
+    if total / 1000 > budget_ms:
+        problems.append(f"{module} takes {total / 1000:.1f} ms to import (budget {budget_ms} ms)")
+    if not allow_gui:
+        pulled = sorted({name for _, _, name, _ in rows if name.split(".")[0] in GUI_MODULES})
+        if pulled:
+            problems.append(f"{module} imports GUI modules: {', '.join(pulled)}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report per-module import costs and enforce the import budgets.")
+    parser.add_argument("modules", nargs="*", help=f"Modules to check (default: {', '.join(BUDGETS)})")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per module")
+    args = parser.parse_args()
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    problems = []
+    for module in args.modules or BUDGETS:
+        budget_ms, allow_gui = BUDGETS.get(module, (200, False))
+        try:
+            problems += check(module, budget_ms, allow_gui, args.top, cwd=here)
+        except RuntimeError as e:
+            problems.append(str(e))
+    for problem in problems:
+        print(f"OVER BUDGET: {problem}")
+    sys.exit(1 if problems else 0)
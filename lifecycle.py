@@ -0,0 +1,106 @@
+import os
+import json
+
+# --- Booking Lifecycle ---
+# A booking moves requested -> matched -> en_route -> completed, and can be
+# cancelled at any point before it completes. Every change is appended to a
+# small delta log (one JSON line with a timestamp) instead of rewriting
+# bookings.json; the next full snapshot folds the deltas in and empties it.
+
+REQUESTED = "requested"
+MATCHED = "matched"
+EN_ROUTE = "en_route"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+
+STATES = (REQUESTED, MATCHED, EN_ROUTE, COMPLETED, CANCELLED)
+TRANSITIONS = {
+    REQUESTED: {MATCHED, CANCELLED},
+    MATCHED: {EN_ROUTE, CANCELLED},
+    EN_ROUTE: {COMPLETED, CANCELLED},
+    COMPLETED: set(),
+    CANCELLED: set(),
+}
+TERMINAL_STATES = {COMPLETED, CANCELLED}
+LEGACY_STATUSES = {"active": REQUESTED}  # Saved before the lifecycle existed
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+def normalize_status(status):
+    status = LEGACY_STATUSES.get(status, status)
+    if status not in TRANSITIONS:
+        raise ValueError(f"Unknown booking status: {status!r}")
+    return status
+
+
+def check_transition(current, new):
+    if new not in TRANSITIONS.get(current, ()):
+        raise InvalidTransition(f"Cannot move a booking from {current} to {new}")
+
+
+class StateIndex:
+    """Booking IDs per lifecycle state, so per-state counts never scan the bookings."""
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.by_state = {state: set() for state in STATES}
+
+    def add(self, booking_id, state):
+        self.by_state[state].add(booking_id)
+
+    def remove(self, booking_id, state):
+        self.by_state[state].discard(booking_id)
+
+    def move(self, booking_id, old, new):
+        self.by_state[old].discard(booking_id)
+        self.by_state[new].add(booking_id)
+
+    def count(self, state):
+        return len(self.by_state[state])
+
+    def counts(self):
+        return {state: len(ids) for state, ids in self.by_state.items()}
+
+    def ids(self, state):
+        return set(self.by_state[state])
+
+
+class DeltaLog:
+    """
+    Append-only JSON Lines file of booking changes:
+        {"op": "create", "ts": ..., "booking": {...}}
+        {"op": "transition", "ts": ..., "id": ..., "from": ..., "to": ...}
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, *records, fsync=True):
+        payload = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+    def replay(self):
+        """Yields the logged records in order, stopping at a torn last line."""
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    break
+
+    def truncate(self):
+        if os.path.exists(self.path):
+            open(self.path, "w").close()
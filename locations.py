@@ -0,0 +1,142 @@
+import json
+import math
+
+# --- Location Registry ---
+# Named pickup/drop-off points with coordinates. Distances are estimated from
+# the great-circle distance times a road factor, and a uniform grid index
+# answers nearest-point and within-radius queries without scanning every location.
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + \
+        math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Location:
+    def __init__(self, name, lat, lon):
+        self.name = name
+        self.lat = lat
+        self.lon = lon
+
+    def to_dict(self):
+        return self.__dict__
+
+
+class LocationRegistry:
+    def __init__(self, cell_deg=0.01, road_factor=1.3):
+        self.cell_deg = cell_deg        # Grid cell size in degrees (~1.1 km)
+        self.road_factor = road_factor  # Roads are longer than straight lines
+        self.locations = {}             # name -> Location
+        self._grid = {}                 # (cell_x, cell_y) -> [Location, ...]
+        self._bounds = None             # (min_x, min_y, max_x, max_y) of occupied cells
+        self.version = 0                # Bumped on every add/remove, so views can tell when to refit
+
+    def _cell(self, lat, lon):
+        return (int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg)))
+
+    def add(self, name, lat, lon):
+        if name in self.locations:
+            self.remove(name)
+        location = Location(name, lat, lon)
+        self.locations[name] = location
+        self.version += 1
+        cell = self._cell(lat, lon)
+        self._grid.setdefault(cell, []).append(location)
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        else:
+            min_x, min_y, max_x, max_y = self._bounds
+            self._bounds = (min(min_x, cell[0]), min(min_y, cell[1]), max(max_x, cell[0]), max(max_y, cell[1]))
+        return location
+
+    def remove(self, name):
+        location = self.locations.pop(name, None)
+        if location:
+            self.version += 1
+            cell = self._cell(location.lat, location.lon)
+            self._grid[cell].remove(location)
+            if not self._grid[cell]:
+                del self._grid[cell]
+
+    def get(self, name):
+        return self.locations.get(name)
+
+    def __contains__(self, name):
+        return name in self.locations
+
+    def __len__(self):
+        return len(self.locations)
+
+    def names(self):
+        return list(self.locations)
+
+    def distance(self, start, end):
+        """Estimated road distance in km between two named locations (None if unknown)."""
+        a, b = self.locations.get(start), self.locations.get(end)
+        if a is None or b is None:
+            return None
+        return round(haversine_km(a.lat, a.lon, b.lat, b.lon) * self.road_factor, 1)
+
+    def nearest(self, lat, lon):
+        """Closest registered location to a coordinate (straight-line), or None."""
+        if not self.locations:
+            return None
+        cx, cy = self._cell(lat, lon)
+        # Smallest distance one grid ring can span, used to know when to stop
+        ring_km = self.cell_deg * KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01)
+        best, best_km = None, float("inf")
+        min_x, min_y, max_x, max_y = self._bounds
+        max_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+        for ring in range(max_ring + 1):
+            for cell in self._ring_cells(cx, cy, ring):
+                for location in self._grid.get(cell, ()):
+                    km = haversine_km(lat, lon, location.lat, location.lon)
+                    if km < best_km:
+                        best, best_km = location, km
+            # Anything in further rings is at least ring * ring_km away
+            if best is not None and best_km <= ring * ring_km:
+                break
+        return best
+
+    def within_radius(self, lat, lon, radius_km):
+        """[(Location, km), ...] within radius_km of a coordinate, nearest first."""
+        dlat = radius_km / KM_PER_DEG_LAT
+        dlon = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 0.01))
+        min_x, min_y = self._cell(lat - dlat, lon - dlon)
+        max_x, max_y = self._cell(lat + dlat, lon + dlon)
+        found = []
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                for location in self._grid.get((x, y), ()):
+                    km = haversine_km(lat, lon, location.lat, location.lon)
+                    if km <= radius_km:
+                        found.append((location, km))
+        found.sort(key=lambda item: item[1])
+        return found
+
+    @staticmethod
+    def _ring_cells(cx, cy, ring):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for x in range(cx - ring, cx + ring + 1):
+            yield (x, cy - ring)
+            yield (x, cy + ring)
+        for y in range(cy - ring + 1, cy + ring):
+            yield (cx - ring, y)
+            yield (cx + ring, y)
+
+    def load(self, path):
+        """Adds locations from a JSON list of {"name", "lat", "lon"} objects."""
+        with open(path, "r", encoding="utf-8") as f:
+            for entry in json.load(f):
+                self.add(entry["name"], entry["lat"], entry["lon"])
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([loc.to_dict() for loc in self.locations.values()], f, indent=2)
@@ -0,0 +1,365 @@
+import os
+import sys
+import mmap
+import time
+import heapq
+import struct
+import threading
+import argparse
+from datetime import datetime
+
+# --- booking_log.txt Offset Index ---
+# booking_log.txt.idx is an append-only journal with one line per log entry:
+#     booking_id <TAB> byte offset <TAB> length <TAB> unix time
+# It is written together with the log, so it is always in time order and can
+# be binary-searched by time. For ID lookups the journal is periodically
+# compacted into booking_log.txt.idx.sorted, a fixed-width binary file sorted
+# by booking ID that is memory-mapped and binary-searched; only the journal
+# lines written since the last compaction are held in memory. Compaction is
+# triggered from the append path (the writer thread), never by a lookup.
+# Either way a lookup is a handful of seeks, not a scan of the log.
+
+JOURNAL_SUFFIX = ".idx"
+SORTED_SUFFIX = ".idx.sorted"
+SORTED_MAGIC = b"ENVLIDX1"
+HEADER = struct.Struct("<8sQQ")    # magic, journal bytes covered, log bytes covered
+RECORD = struct.Struct("<32sQIQ")  # booking id (padded), offset, length, time in ms
+COMPACT_THRESHOLD = 10000          # Journal lines kept in memory before the writer compacts
+
+
+def journal_path_for(log_path):
+    return log_path + JOURNAL_SUFFIX
+
+
+def _entry_id(line):
+    # "ACTION | ID: abcd1234 | ..." -> "abcd1234"
+    parts = line.split(b" | ", 2)
+    if len(parts) >= 2 and parts[1].startswith(b"ID: "):
+        return parts[1][4:].decode("utf-8", "replace").strip()
+    return None
+
+
+def _parse_journal_line(line):
+    parts = line.rstrip(b"\n").split(b"\t")
+    if len(parts) != 4 or not line.endswith(b"\n"):
+        return None # Torn write at the end of the journal
+    return parts[0].decode("utf-8"), int(parts[1]), int(parts[2]), float(parts[3])
+
+
+def append_entry(log_path, log_entry, booking_id, fsync=False):
+    """Appends one line to the log and its entry to the index journal."""
+    return append_entries(log_path, [(log_entry, booking_id)], fsync)[0][0]
+
+
+def append_entries(log_path, entries, fsync=False):
+    """
+    Appends [(log_entry, booking_id), ...] to the log and the index journal
+    with one write (and one fsync) each. Returns [(offset, length), ...].
+    """
+    chunks = [log_entry.encode("utf-8") for log_entry, _ in entries]
+    spans = []
+    with open(log_path, "ab") as log_file:
+        offset = log_file.seek(0, os.SEEK_END)
+        for data in chunks:
+            spans.append((offset, len(data)))
+            offset += len(data)
+        log_file.write(b"".join(chunks))
+        log_file.flush()
+        if fsync:
+            os.fsync(log_file.fileno())
+    now = time.time()
+    with open(journal_path_for(log_path), "a", encoding="utf-8") as journal:
+        journal.write("".join(f"{booking_id}\t{offset}\t{length}\t{now:.3f}\n"
+                              for (_, booking_id), (offset, length) in zip(entries, spans)))
+        if fsync:
+            journal.flush()
+            os.fsync(journal.fileno())
+    return spans
+
+
+def clear(log_path):
+    """Truncates the log and drops its index."""
+    open(log_path, "w").close()
+    open(journal_path_for(log_path), "w").close()
+    try:
+        os.remove(log_path + SORTED_SUFFIX)
+    except OSError:
+        pass
+
+
+class LogIndex:
+    def __init__(self, log_path="booking_log.txt"):
+        self.log_path = log_path
+        self.journal_path = journal_path_for(log_path)
+        self.sorted_path = log_path + SORTED_SUFFIX
+        self._file = None
+        self._map = None
+        self.count = 0             # Records in the sorted file
+        self.journal_covered = 0   # Journal bytes folded into the sorted file
+        self.tail = {}             # booking_id -> [(offset, length), ...] from newer journal lines
+        self.tail_count = 0
+        self.indexed_to = 0        # Log bytes covered by the index
+        # Appends and compaction run on the writer thread while lookups run on the UI thread
+        self._lock = threading.RLock()
+        self.load()
+
+    # -- loading --
+    def load(self):
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        self.close()
+        self.count = self.journal_covered = self.indexed_to = 0
+        self.tail = {}
+        self.tail_count = 0
+        try:
+            self._file = open(self.sorted_path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.journal_covered, self.indexed_to = HEADER.unpack_from(self._map, 0)
+            if magic != SORTED_MAGIC:
+                raise ValueError("bad index header")
+            self.count = (len(self._map) - HEADER.size) // RECORD.size
+        except (OSError, ValueError, struct.error):
+            self.close()
+            self.count = self.journal_covered = self.indexed_to = 0
+
+        try:
+            with open(self.journal_path, "rb") as journal:
+                journal.seek(self.journal_covered)
+                for line in journal:
+                    entry = _parse_journal_line(line)
+                    if entry:
+                        self._add_tail(*entry)
+        except OSError:
+            pass
+        self._catch_up()
+
+    def _add_tail(self, booking_id, offset, length, timestamp):
+        self.tail.setdefault(booking_id, []).append((offset, length))
+        self.tail_count += 1
+        self.indexed_to = max(self.indexed_to, offset + length)
+
+    def append(self, log_entry, booking_id, fsync=False):
+        """Appends a line to the log and journal, and indexes it in memory."""
+        return self.append_many([(log_entry, booking_id)], fsync)[0][0]
+
+    def append_many(self, entries, fsync=False):
+        """Appends [(log_entry, booking_id), ...] in one write and indexes them in memory."""
+        spans = append_entries(self.log_path, entries, fsync)
+        now = time.time()
+        with self._lock:
+            for (_, booking_id), (offset, length) in zip(entries, spans):
+                self._add_tail(booking_id, offset, length, now)
+        return spans
+
+    def needs_compaction(self):
+        return self.tail_count >= COMPACT_THRESHOLD
+
+    def clear(self):
+        """Truncates the log and drops its index."""
+        with self._lock:
+            self.close()
+            clear(self.log_path)
+            self._load()
+
+    def _catch_up(self):
+        """Indexes log lines written without the journal (older versions, manual edits)."""
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except OSError:
+            return
+        if log_size < self.indexed_to:
+            # Log was truncated or replaced: start over
+            self._rebuild()
+            return
+        if log_size == self.indexed_to:
+            return
+        # Entries recovered this way have no recorded time; use the log's mtime
+        fallback_time = os.path.getmtime(self.log_path)
+        with open(self.log_path, "rb") as log_file, \
+                open(self.journal_path, "a", encoding="utf-8") as journal:
+            log_file.seek(self.indexed_to)
+            offset = self.indexed_to
+            for line in log_file:
+                if not line.endswith(b"\n"):
+                    break # Partial last line; pick it up next time
+                booking_id = _entry_id(line)
+                if booking_id:
+                    self._add_tail(booking_id, offset, len(line), fallback_time)
+                    journal.write(f"{booking_id}\t{offset}\t{len(line)}\t{fallback_time:.3f}\n")
+                offset += len(line)
+            self.indexed_to = max(self.indexed_to, offset)
+
+    def rebuild(self):
+        """Rebuilds the whole index from a single scan of the log."""
+        with self._lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        self.close()
+        open(self.journal_path, "w").close()
+        try:
+            os.remove(self.sorted_path)
+        except OSError:
+            pass
+        self.count = self.journal_covered = self.indexed_to = 0
+        self.tail = {}
+        self.tail_count = 0
+        self._catch_up()
+
+    # -- compaction --
+    def _sorted_records(self):
+        for i in range(self.count):
+            raw_id, offset, length, ms = RECORD.unpack_from(self._map, HEADER.size + i * RECORD.size)
+            yield raw_id, offset, length, ms
+
+    def compact(self):
+        """Merges the journal tail into the sorted file (streaming merge, atomic replace)."""
+        if not os.path.exists(self.journal_path):
+            return
+        journal_size = os.path.getsize(self.journal_path)
+        tail_records = []
+        with open(self.journal_path, "rb") as journal:
+            journal.seek(self.journal_covered)
+            while journal.tell() < journal_size:
+                entry = _parse_journal_line(journal.readline())
+                if entry:
+                    booking_id, offset, length, timestamp = entry
+                    raw_id = booking_id.encode("utf-8")[:32].ljust(32, b"\0")
+                    tail_records.append((raw_id, offset, length, int(timestamp * 1000)))
+        tail_records.sort()
+
+        tmp_path = self.sorted_path + ".tmp"
+        with open(tmp_path, "wb") as out:
+            out.write(HEADER.pack(SORTED_MAGIC, journal_size, self.indexed_to))
+            for record in heapq.merge(self._sorted_records(), tail_records):
+                out.write(RECORD.pack(*record))
+            out.flush()
+            os.fsync(out.fileno())
+        with self._lock: # Lookups keep using the old sorted file until here
+            self.close()
+            os.replace(tmp_path, self.sorted_path)
+            self._load()
+
+    # -- queries --
+    def _sorted_spans(self, booking_id):
+        if not self.count:
+            return []
+        key = booking_id.encode("utf-8")[:32].ljust(32, b"\0")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = HEADER.size + mid * RECORD.size
+            if self._map[start:start + 32] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        spans = []
+        while lo < self.count:
+            raw_id, offset, length, _ = RECORD.unpack_from(self._map, HEADER.size + lo * RECORD.size)
+            if raw_id != key:
+                break
+            spans.append((offset, length))
+            lo += 1
+        return spans
+
+    def _read(self, spans):
+        lines = []
+        with open(self.log_path, "rb") as log_file:
+            for offset, length in spans:
+                log_file.seek(offset)
+                lines.append(log_file.read(length).decode("utf-8").rstrip("\n"))
+        return lines
+
+    def lookup(self, booking_id):
+        """Every log line for a booking, oldest first."""
+        with self._lock:
+            spans = self._sorted_spans(booking_id) + self.tail.get(booking_id, [])
+        spans.sort()
+        return self._read(spans)
+
+    def between(self, start_time=None, end_time=None):
+        """Log lines appended between two unix times (inclusive), via the time-ordered journal."""
+        spans = []
+        try:
+            journal = open(self.journal_path, "rb")
+        except OSError:
+            return []
+        with journal:
+            size = journal.seek(0, os.SEEK_END)
+            journal.seek(self._journal_seek_time(journal, size, start_time) if start_time else 0)
+            for line in journal:
+                entry = _parse_journal_line(line)
+                if not entry:
+                    continue
+                if end_time is not None and entry[3] > end_time:
+                    break
+                spans.append((entry[1], entry[2]))
+        return self._read(spans)
+
+    @staticmethod
+    def _journal_seek_time(journal, size, timestamp):
+        """Byte position of the first journal line at or after `timestamp` (binary search)."""
+        lo, hi = 0, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid > 0:
+                journal.seek(mid - 1)
+                journal.readline() # Skip to the first line starting at or after mid
+            else:
+                journal.seek(0)
+            pos = journal.tell()
+            line = journal.readline()
+            entry = _parse_journal_line(line) if line else None
+            if not line or pos >= hi:
+                hi = mid
+            elif entry and entry[3] < timestamp:
+                lo = pos + len(line)
+            else:
+                hi = mid
+        return lo
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Look up booking_log.txt entries through the offset index.")
+    parser.add_argument("booking_id", nargs="?", help="Booking ID to show the audit trail for")
+    parser.add_argument("--log", default="booking_log.txt", help="Path to the booking log")
+    parser.add_argument("--since", help="Show entries from this time (unix time or ISO date)")
+    parser.add_argument("--until", help="Show entries up to this time (unix time or ISO date)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from the log first")
+    parser.add_argument("--compact", action="store_true", help="Fold the journal into the sorted index")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = LogIndex(args.log)
+    if args.rebuild:
+        index.rebuild()
+    if args.compact or args.rebuild:
+        index.compact()
+    lines = []
+    if args.booking_id:
+        lines = index.lookup(args.booking_id)
+    elif args.since or args.until:
+        lines = index.between(args.since and _parse_time(args.since), args.until and _parse_time(args.until))
+    elif not (args.rebuild or args.compact):
+        parser.error("give a booking ID, --since/--until, --rebuild or --compact")
+    for line in lines:
+        print(line)
+    print(f"({len(lines)} entries, {(time.perf_counter() - start) * 1000:.1f} ms)", file=sys.stderr)
+    index.close()
@@ -1,6 +1,37 @@
 # Main
-from gui import App
+import sys
+
+
+def run_command(argv):
+    """Headless subcommands (python main.py batch|archive ...); returns the exit code."""
+    import argparse
+    import batch
+    parser = argparse.ArgumentParser(description="Enavroom booking app. Run without arguments to open the app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    batch.add_arguments(commands.add_parser("batch", help="Quote or book trips from a JSONL/CSV file without the GUI"))
+    archive = commands.add_parser("archive", help="Move closed bookings out of bookings.json into booking_archive/")
+    archive.add_argument("--bookings", default="bookings.json", help="Bookings file to archive from")
+    archive.add_argument("--older-than-hours", type=float, default=None,
+                         help="Only bookings created this long ago (default: 24)")
+    args = parser.parse_args(argv)
+    if args.command == "archive":
+        return archive_command(args)
+    return batch.main(args)
+
+
+def archive_command(args):
+    from bookingsystem import BookingSystem, ARCHIVE_AFTER_SECONDS
+    system = BookingSystem(args.bookings)
+    older_than = ARCHIVE_AFTER_SECONDS if args.older_than_hours is None else args.older_than_hours * 3600
+    moved = system.archive_closed(older_than)
+    print(f"archive: moved {moved} closed bookings, {len(system.bookings)} left in {args.bookings}", file=sys.stderr)
+    return 0
+
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(run_command(sys.argv[1:]))
+    # The GUI (Tk, PIL) is only imported when it is actually launched
+    from gui import App
     app = App()
     app.mainloop()
@@ -0,0 +1,237 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from collections import Counter, deque
+
+# --- Memory Report ---
+# On-demand breakdown of what a long-running app is holding: Booking objects
+# (and the indexes around them), the PhotoImages kept alive in gui's
+# _image_references, and the live widgets under each page frame. Python
+# allocations are attributed with tracemalloc, and every report is kept as a
+# snapshot so growth between reports shows up as a diff.
+# tracemalloc slows every allocation down, so a report starts it only for as
+# long as it takes to measure and stops it again, unless the profiler keeps
+# tracing for periodic snapshots (then growth is also broken down by line).
+# Start the app with PYTHONTRACEMALLOC=1 to have every allocation attributed.
+
+TRACE_FRAMES = 1 # Reports group by file and line; deeper tracebacks only add cost
+
+
+def _booking_bytes(booking):
+    """Shallow size of one Booking: the object, its __dict__ and the field values (shared strings counted each time)."""
+    fields = booking.__dict__
+    return sys.getsizeof(booking) + sys.getsizeof(fields) + sum(sys.getsizeof(v) for v in fields.values())
+
+
+def booking_usage(system):
+    """Booking objects held by a BookingSystem and the containers that index them."""
+    by_status = Counter(booking.status for booking in system.bookings)
+    objects = sum(_booking_bytes(booking) for booking in system.bookings)
+    indexes = sys.getsizeof(system.bookings) + sys.getsizeof(system._by_id)
+    indexes += sum(sys.getsizeof(ids) for ids in system.states.by_state.values())
+    return {
+        "count": len(system.bookings),
+        "by_status": dict(by_status),
+        "object_bytes": objects,
+        "index_bytes": indexes,
+        "avg_bytes": objects / len(system.bookings) if system.bookings else 0,
+    }
+
+
+def image_usage(references, top=10):
+    """PhotoImages in `references` (key -> PhotoImage); Tk keeps 4 bytes per pixel for each."""
+    entries = []
+    for key, photo in references.items():
+        try:
+            width, height = photo.width(), photo.height()
+        except Exception: # Image deleted out from under the cache
+            width = height = 0
+        entries.append({"key": os.path.basename(key), "width": width, "height": height,
+                        "pixel_bytes": width * height * 4})
+    entries.sort(key=lambda entry: entry["pixel_bytes"], reverse=True)
+    return {
+        "count": len(entries),
+        "pixel_bytes": sum(entry["pixel_bytes"] for entry in entries),
+        "largest": entries[:top],
+    }
+
+
+def count_widgets(widget):
+    """Number of widgets below `widget` (not counting itself), by Tk class."""
+    classes = Counter()
+    pending = list(widget.winfo_children())
+    while pending:
+        child = pending.pop()
+        classes[child.winfo_class()] += 1
+        pending.extend(child.winfo_children())
+    return classes
+
+
+def widget_usage(app):
+    pages = {}
+    for page_name, frame in app.frames.items():
+        classes = count_widgets(frame)
+        pages[page_name] = {"widgets": sum(classes.values()), "by_class": dict(classes.most_common(5))}
+    return {"total": sum(count_widgets(app).values()), "pages": pages}
+
+
+class MemoryProfiler:
+    def __init__(self, app=None, system=None, image_references=None, keep=20, keep_tracing=False):
+        self.app = app
+        self.system = system if system is not None else getattr(app, "booking_system", None)
+        self.image_references = image_references
+        self.history = deque(maxlen=keep)  # Summary of every report, oldest first
+        self._last_snapshot = None         # Only the latest tracemalloc snapshot is kept; they are large
+        self.tracing_since = None
+        self.keep_tracing = keep_tracing   # Leave tracemalloc running between reports
+
+    def _ensure_tracing(self):
+        """Starts tracemalloc if needed; True if this call started it."""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start(TRACE_FRAMES)
+        self.tracing_since = time.time()
+        self._last_snapshot = None # Traces from an earlier tracing session don't compare
+        print("DEBUG: tracemalloc started; allocations made before now are not attributed.")
+        return True
+
+    def snapshot(self, top=10):
+        """Measures everything once and returns the report dict (also kept in history)."""
+        started = self._ensure_tracing()
+        try:
+            return self._snapshot(top)
+        finally:
+            if started and not self.keep_tracing:
+                tracemalloc.stop()
+                self.tracing_since = None
+                self._last_snapshot = None
+
+    def _snapshot(self, top):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        report = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "time": time.time(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "top_files": [{"file": stat.traceback[0].filename, "bytes": stat.size, "blocks": stat.count}
+                          for stat in snapshot.statistics("filename")[:top]],
+        }
+        if self.system is not None:
+            report["bookings"] = booking_usage(self.system)
+        if self.image_references is not None:
+            report["images"] = image_usage(self.image_references, top)
+        if self.app is not None:
+            report["widgets"] = widget_usage(self.app)
+
+        previous = self.history[-1] if self.history else None
+        if previous is not None:
+            report["growth"] = self._growth(previous, report, snapshot, top)
+        self._last_snapshot = snapshot
+        self.history.append({
+            "at": report["at"],
+            "time": report["time"],
+            "traced_bytes": current,
+            "tracing_since": self.tracing_since,
+            "bookings": report.get("bookings", {}).get("count"),
+            "image_bytes": report.get("images", {}).get("pixel_bytes"),
+            "widgets": report.get("widgets", {}).get("total"),
+        })
+        report["history"] = list(self.history)
+        return report
+
+    def _growth(self, previous, report, snapshot, top):
+        growth = {
+            "since": previous["at"],
+            "seconds": report["time"] - previous["time"],
+            # Traced bytes only compare within one tracing session
+            "traced_bytes": (report["traced_bytes"] - previous["traced_bytes"]
+                             if self.tracing_since is not None and previous.get("tracing_since") == self.tracing_since
+                             else None),
+            "bookings": _delta(report.get("bookings", {}).get("count"), previous["bookings"]),
+            "image_bytes": _delta(report.get("images", {}).get("pixel_bytes"), previous["image_bytes"]),
+            "widgets": _delta(report.get("widgets", {}).get("total"), previous["widgets"]),
+        }
+        if self._last_snapshot is not None:
+            growth["top_lines"] = [
+                {"line": str(stat.traceback), "bytes": stat.size_diff, "blocks": stat.count_diff}
+                for stat in snapshot.compare_to(self._last_snapshot, "lineno")[:top] if stat.size_diff > 0
+            ]
+        return growth
+
+    def dump(self, path="memory_report.json", top=10):
+        """Prints a report and writes it to a JSON file."""
+        report = self.snapshot(top)
+        print(format_report(report))
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+
+def _delta(now, before):
+    return now - before if now is not None and before is not None else None
+
+
+def _mb(nbytes):
+    return f"{nbytes / (1024 * 1024):.2f} MB"
+
+
+def format_report(report):
+    lines = [f"Memory report at {report['at']}: {_mb(report['traced_bytes'])} traced "
+             f"(peak {_mb(report['traced_peak_bytes'])})"]
+    bookings = report.get("bookings")
+    if bookings:
+        lines.append(f"  Bookings: {bookings['count']} objects, {_mb(bookings['object_bytes'])} "
+                     f"(~{bookings['avg_bytes']:.0f} B each) + {_mb(bookings['index_bytes'])} in indexes; "
+                     + ", ".join(f"{status} {n}" for status, n in sorted(bookings["by_status"].items())))
+    images = report.get("images")
+    if images:
+        lines.append(f"  Images: {images['count']} PhotoImages, {_mb(images['pixel_bytes'])} of pixels")
+        for entry in images["largest"]:
+            lines.append(f"    {entry['pixel_bytes'] / 1024:9.0f} KB  {entry['width']}x{entry['height']}  {entry['key']}")
+    widgets = report.get("widgets")
+    if widgets:
+        lines.append(f"  Widgets: {widgets['total']} live")
+        for page, row in sorted(widgets["pages"].items(), key=lambda item: -item[1]["widgets"]):
+            classes = ", ".join(f"{name} {n}" for name, n in row["by_class"].items())
+            lines.append(f"    {row['widgets']:6}  {page} ({classes})")
+    lines.append("  Top files:")
+    for stat in report["top_files"]:
+        lines.append(f"    {stat['bytes'] / 1024:9.0f} KB  {stat['file']}")
+    growth = report.get("growth")
+    if growth:
+        changes = [f"{name} {growth[name]:+}" for name in ("bookings", "image_bytes", "widgets")
+                   if growth[name] is not None]
+        if growth["traced_bytes"] is not None:
+            changes.insert(0, f"{growth['traced_bytes'] / 1024:+.0f} KB traced")
+        lines.append(f"  Growth since {growth['since']} ({growth['seconds']:.0f}s): " + ", ".join(changes))
+        for stat in growth.get("top_lines", []):
+            lines.append(f"    {stat['bytes'] / 1024:+9.0f} KB  {stat['blocks']:+6} blocks  {stat['line']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory report for a bookings store, or for saved app reports.")
+    parser.add_argument("reports", nargs="*", help="memory_report.json files saved by the app (Ctrl+Shift+M) to print")
+    parser.add_argument("--bookings", help="Load this bookings file and report what it costs in memory")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table")
+    parser.add_argument("--json", help="Also write the --bookings report to this file")
+    args = parser.parse_args()
+
+    for path in args.reports:
+        with open(path, "r") as f:
+            print(format_report(json.load(f)))
+    if args.bookings or not args.reports:
+        tracemalloc.start(TRACE_FRAMES) # Before the store loads, so its allocations are attributed
+        from bookingsystem import BookingSystem
+        profiler = MemoryProfiler(system=BookingSystem(args.bookings or "bookings.json"))
+        if args.json:
+            profiler.dump(args.json, args.top)
+        else:
+            print(format_report(profiler.snapshot(args.top)))
@@ -0,0 +1,204 @@
+import json
+import math
+import time
+
+# --- Rule-Based Pricing Engine ---
+# Fare rules are loaded once and compiled into plain lookup tables, so a quote
+# is a few dictionary/list reads and some arithmetic, with no rule matching
+# at request time.
+
+# The original fixed formula: base fare, ₱10 per km after the first
+# (rounded up), plus a per-vehicle surcharge. Per-vehicle fares are filled in
+# from BASE_PRICES / VEHICLE_SURCHARGES by default_rules().
+DEFAULT_RULES = {
+    "vehicles": {},
+    "fallback_vehicle": {"base_fare": 75, "surcharge": 0},
+    "included_km": 1,
+    "per_km": 10,
+    # [{"start_hour": 17, "end_hour": 20, "multiplier": 1.2, "vehicles": [...]}]
+    "time_bands": [],
+    # [{"start": "CEA", "end": "COC", "vehicle": "Car (4-seater)", "fare": 280}]
+    "route_overrides": [],
+    # {"Car (6-seater)": 500}
+    "minimum_fares": {},
+    # {"CODE": {"percent_off": 10, "amount_off": 0, "max_discount": 50}}
+    "promos": {},
+}
+
+
+def default_rules(base_prices, surcharges):
+    """The original fare formula expressed as a rule set."""
+    rules = dict(DEFAULT_RULES)
+    rules["vehicles"] = {
+        name: {"base_fare": base_fare, "surcharge": surcharges.get(name, 0)}
+        for name, base_fare in base_prices.items()
+    }
+    return rules
+
+
+class PricingEngine:
+    def __init__(self, rules=None, defaults=None):
+        self.version = 0
+        self.defaults = defaults or DEFAULT_RULES
+        self.load_rules(rules or {})
+
+    @classmethod
+    def from_file(cls, path, defaults=None):
+        """Builds an engine from a JSON rules file layered over the default rules."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                rules = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: Could not load pricing rules from {path}: {e}. Using defaults.")
+            rules = None
+        return cls(rules, defaults)
+
+    def load_rules(self, rules):
+        """
+        Compiles a rule set (keys missing from `rules` come from the defaults).
+        Bumps `version` so cached quotes go stale.
+        """
+        merged = dict(self.defaults)
+        merged.update(rules)
+        self.rules = merged
+
+        fallback = merged["fallback_vehicle"]
+        self._fallback = (fallback["base_fare"], fallback.get("surcharge", 0))
+        self._vehicles = {
+            name: (cfg["base_fare"], cfg.get("surcharge", 0))
+            for name, cfg in merged["vehicles"].items()
+        }
+        self._included_km = merged["included_km"]
+        self._per_km = merged["per_km"]
+
+        # One multiplier per hour of the day, per vehicle (None = every vehicle)
+        self._hour_multipliers = {None: [1.0] * 24}
+        for band in merged["time_bands"]:
+            start_hour, end_hour = band["start_hour"], band["end_hour"]
+            if not (0 <= start_hour < 24 and 0 < end_hour <= 24 and start_hour != end_hour):
+                raise ValueError(f"Invalid time band hours: {start_hour}-{end_hour}")
+            # A band may wrap past midnight (e.g. 22 -> 5)
+            hours = range(start_hour, end_hour) if start_hour < end_hour else \
+                list(range(start_hour, 24)) + list(range(0, end_hour))
+            for vehicle in band.get("vehicles") or [None]:
+                table = self._hour_multipliers.setdefault(vehicle, list(self._hour_multipliers[None]))
+                for hour in hours:
+                    table[hour] *= band["multiplier"]
+            if not band.get("vehicles"):
+                # Bands for all vehicles also apply on top of vehicle-specific tables
+                for vehicle, table in self._hour_multipliers.items():
+                    if vehicle is not None:
+                        for hour in hours:
+                            table[hour] *= band["multiplier"]
+        self._has_time_bands = bool(merged["time_bands"])
+
+        # Flat fares per route, stored for both directions
+        self._route_fares = {}
+        for override in merged["route_overrides"]:
+            for start, end in ((override["start"], override["end"]), (override["end"], override["start"])):
+                self._route_fares[(override.get("vehicle"), start, end)] = override["fare"]
+
+        self._minimum_fares = dict(merged["minimum_fares"])
+
+        self._promos = {}
+        for code, promo in merged["promos"].items():
+            self._promos[code.upper()] = (
+                promo.get("percent_off", 0) / 100,
+                promo.get("amount_off", 0),
+                promo.get("max_discount"),
+            )
+
+        self.version += 1
+
+    def quote(self, vehicle_type, distance, start=None, end=None, when=None, promo_code=None, surge=1.0):
+        """Returns the fare for one trip using the compiled tables."""
+        base_fare, surcharge = self._vehicles.get(vehicle_type, self._fallback)
+
+        fare = self._route_fares.get((vehicle_type, start, end))
+        if fare is None:
+            fare = self._route_fares.get((None, start, end))
+        if fare is None:
+            fare = base_fare
+            if distance > self._included_km:
+                additional_km = math.ceil(distance - self._included_km)
+                fare += additional_km * self._per_km
+            fare += surcharge
+
+        if self._has_time_bands:
+            hour = time.localtime(when).tm_hour
+            table = self._hour_multipliers.get(vehicle_type, self._hour_multipliers[None])
+            fare *= table[hour]
+
+        if surge != 1.0:
+            fare *= surge
+
+        fare = max(fare, self._minimum_fares.get(vehicle_type, 0))
+
+        if promo_code:
+            promo = self._promos.get(promo_code.upper())
+            if promo:
+                percent_off, amount_off, max_discount = promo
+                discount = fare * percent_off + amount_off
+                if max_discount is not None:
+                    discount = min(discount, max_discount)
+                fare = max(fare - discount, 0)
+
+        # Keep whole-peso fares as ints, like the original formula
+        if fare != int(fare):
+            fare = math.ceil(fare)
+        return int(fare)
+
+    def valid_until(self, when=None):
+        """Epoch time until which a quote made at `when` stays valid (None = forever)."""
+        if not self._has_time_bands:
+            return None
+        now = time.time() if when is None else when
+        local = time.localtime(now)
+        return now - local.tm_min * 60 - local.tm_sec + 3600
+
+
+class QuoteCache:
+    """
+    Memoizes fare quotes. Keys include the pricing version, so reloading rules
+    makes old entries unreachable; entries also expire when time-of-day rules
+    could change the fare, or after `ttl` seconds at the latest.
+    """
+    def __init__(self, ttl=300, max_entries=4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (value, expires_at)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, now=None):
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = time.time() if now is None else now
+            if now < entry[1]:
+                self.hits += 1
+                return entry[0]
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value, now=None, valid_until=None):
+        now = time.time() if now is None else now
+        expires_at = now + self.ttl
+        if valid_until is not None:
+            expires_at = min(expires_at, valid_until)
+        if len(self._entries) >= self.max_entries and key not in self._entries:
+            # Evict the oldest entry (dicts keep insertion order)
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (value, expires_at)
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
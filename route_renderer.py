@@ -0,0 +1,138 @@
+import os
+import hashlib
+
+from asset_cache import CACHE_DIR
+
+# --- Route Map Renderer ---
+# Draws a route (polyline plus pickup / drop-off pins) onto one shared base map
+# instead of needing a pre-rendered image for every pair of locations.
+# Rendered maps are cached on disk and in memory, keyed by route.
+
+BASE_MAP_FILE = "base_map.png"       # Optional background covering MAP_BOUNDS
+PICKUP_PIN_FILE = "blue_dot.png"
+DROPOFF_PIN_FILE = "red_dot.png"
+ROUTE_COLOR = (106, 13, 173)         # HIGHLIGHT_COLOR
+ROUTE_WIDTH = 5
+PIN_SIZE = (24, 24)
+
+
+class RouteRenderer:
+    def __init__(self, registry, asset_dir, cache_dir=None, size=(375, 300), bounds=None, margin=0.15):
+        self.registry = registry
+        self.asset_dir = asset_dir
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, "routes")
+        self.size = size
+        self.margin = margin
+        self._fixed_bounds = bounds
+        self._fitted = None
+        self._fitted_version = None # Registry version the fitted bounds were computed for
+        self._paths = {}  # (start, end) -> rendered PNG path
+
+    @property
+    def bounds(self):
+        """Map area; refitted when locations are registered or removed, unless given to the constructor."""
+        if self._fixed_bounds:
+            return self._fixed_bounds
+        self._refit()
+        return self._fitted
+
+    def _refit(self):
+        if self._fixed_bounds is None and self._fitted_version != self.registry.version:
+            self._fitted = self._fit_bounds(self.margin)
+            self._fitted_version = self.registry.version
+            self._paths = {} # Rendered for the old bounds
+
+    def _fit_bounds(self, margin):
+        """(min_lat, min_lon, max_lat, max_lon) around every registered location."""
+        lats = [loc.lat for loc in self.registry.locations.values()] or [0.0]
+        lons = [loc.lon for loc in self.registry.locations.values()] or [0.0]
+        pad_lat = max((max(lats) - min(lats)) * margin, 0.002)
+        pad_lon = max((max(lons) - min(lons)) * margin, 0.002)
+        return (min(lats) - pad_lat, min(lons) - pad_lon, max(lats) + pad_lat, max(lons) + pad_lon)
+
+    def project(self, lat, lon):
+        """Coordinate -> pixel position on the rendered map."""
+        min_lat, min_lon, max_lat, max_lon = self.bounds
+        x = (lon - min_lon) / (max_lon - min_lon) * self.size[0]
+        y = (max_lat - lat) / (max_lat - min_lat) * self.size[1]
+        return (x, y)
+
+    def _key(self, start, end):
+        a, b = self.registry.get(start), self.registry.get(end)
+        raw = f"{start}|{a.lat},{a.lon}|{end}|{b.lat},{b.lon}|{self.size}|{self.bounds}|{self._base_stamp()}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _base_stamp(self):
+        try:
+            st = os.stat(os.path.join(self.asset_dir, BASE_MAP_FILE))
+            return f"{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            return "plain"
+
+    def can_render(self, start, end):
+        return start in self.registry and end in self.registry
+
+    def cached_path(self, start, end):
+        """Path of an already rendered map for this route, or None (cheap, UI-thread safe)."""
+        self._refit() # Forgets paths rendered before locations changed
+        path = self._paths.get((start, end))
+        if path:
+            return path
+        if not self.can_render(start, end):
+            return None
+        path = os.path.join(self.cache_dir, f"route_{self._key(start, end)}.png")
+        if os.path.exists(path):
+            self._paths[(start, end)] = path
+            return path
+        return None
+
+    def render(self, start, end):
+        """Renders (or reuses) the map for a route and returns the PNG path. Runs off the UI thread."""
+        path = self.cached_path(start, end)
+        if path:
+            return path
+        if not self.can_render(start, end):
+            raise KeyError(f"No coordinates for route {start} → {end}")
+
+        from PIL import ImageDraw # Deferred: cached routes never need PIL
+        img = self._base_map()
+        draw = ImageDraw.Draw(img)
+        a, b = self.registry.get(start), self.registry.get(end)
+        points = [self.project(a.lat, a.lon), self.project(b.lat, b.lon)]
+        draw.line(points, fill=ROUTE_COLOR, width=ROUTE_WIDTH, joint="curve")
+        self._draw_pin(img, draw, points[0], PICKUP_PIN_FILE, (0, 90, 255))
+        self._draw_pin(img, draw, points[-1], DROPOFF_PIN_FILE, (255, 0, 0))
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"route_{self._key(start, end)}.png")
+        tmp_path = path + ".tmp"
+        img.save(tmp_path, "PNG")
+        os.replace(tmp_path, path)
+        self._paths[(start, end)] = path
+        print(f"DEBUG: Rendered route map {start} → {end}: {path}")
+        return path
+
+    def _base_map(self):
+        from PIL import Image, ImageDraw
+        base_path = os.path.join(self.asset_dir, BASE_MAP_FILE)
+        if os.path.exists(base_path):
+            return Image.open(base_path).convert("RGB").resize(self.size, Image.LANCZOS)
+        # Plain street-grid background when no base map is installed
+        img = Image.new("RGB", self.size, (235, 235, 228))
+        draw = ImageDraw.Draw(img)
+        for x in range(0, self.size[0], 40):
+            draw.line([(x, 0), (x, self.size[1])], fill=(255, 255, 255), width=3)
+        for y in range(0, self.size[1], 40):
+            draw.line([(0, y), (self.size[0], y)], fill=(255, 255, 255), width=3)
+        return img
+
+    def _draw_pin(self, img, draw, point, pin_file, fallback_color):
+        from PIL import Image
+        x, y = point
+        pin_path = os.path.join(self.asset_dir, pin_file)
+        if os.path.exists(pin_path):
+            pin = Image.open(pin_path).convert("RGBA").resize(PIN_SIZE, Image.LANCZOS)
+            img.paste(pin, (int(x - PIN_SIZE[0] / 2), int(y - PIN_SIZE[1] / 2)), pin)
+        else:
+            r = PIN_SIZE[0] / 2
+            draw.ellipse((x - r, y - r, x + r, y + r), fill=fallback_color, outline=(255, 255, 255), width=2)
@@ -0,0 +1,145 @@
+import heapq
+import itertools
+import time
+
+# --- Cooperative Task Scheduler ---
+# Runs generator-based tasks on the Tk event loop in short slices, so long
+# UI work (rebuilding a list of widgets, for example) is spread over many
+# callbacks instead of freezing input. A task yields whenever it is safe to
+# pause; the scheduler resumes it in a later slice. Yielding a number sleeps
+# the task for that many milliseconds, which also makes plain timers and
+# repeating animations tasks. Slices run from after_idle, so pending input
+# and redraws always get in first.
+
+HIGH, NORMAL, LOW = 0, 1, 2
+
+
+class Task:
+    def __init__(self, scheduler, gen, priority, name, on_done):
+        self.scheduler = scheduler
+        self.gen = gen
+        self.priority = priority
+        self.name = name
+        self.on_done = on_done
+        self.cancelled = False
+        self.done = False
+        self.wake_at = 0.0
+
+    def cancel(self):
+        """Stops the task; it is never resumed and on_done is not called."""
+        if not self.done and not self.cancelled:
+            self.cancelled = True
+            if not self.gen.gi_running: # A task cancelling itself just isn't resumed
+                self.gen.close()
+
+    @property
+    def alive(self):
+        return not (self.done or self.cancelled)
+
+
+class Scheduler:
+    def __init__(self, root, slice_ms=8, monitor=None):
+        self.root = root
+        self.slice_ms = slice_ms          # Work budget per slice, well inside one 16 ms frame
+        self.monitor = monitor            # Optional StallMonitor: each step is timed under the task name
+        self._ready = []                  # heap of (priority, seq, Task)
+        self._sleeping = []               # heap of (wake_at, seq, Task)
+        self._seq = itertools.count()
+        self._slice_job = None
+        self._timer_job = None
+        self._timer_at = None
+
+    # -- creating tasks --
+    def spawn(self, gen, priority=NORMAL, name=None, on_done=None):
+        """Schedules a generator; on_done(result) runs with its return value when it finishes."""
+        task = Task(self, gen, priority, name or getattr(gen, "__name__", "task"), on_done)
+        self._make_ready(task)
+        return task
+
+    def call_later(self, delay_ms, func, *args, priority=NORMAL, name=None):
+        """Runs func(*args) once after delay_ms, as a cancellable task."""
+        def timer():
+            yield delay_ms
+            func(*args)
+        return self.spawn(timer(), priority, name or getattr(func, "__name__", "timer"))
+
+    def every(self, interval_ms, func, *args, priority=NORMAL, name=None):
+        """Runs func(*args) every interval_ms until the task is cancelled."""
+        def repeat():
+            while True:
+                func(*args)
+                yield interval_ms
+        return self.spawn(repeat(), priority, name or getattr(func, "__name__", "repeat"))
+
+    def cancel_all(self):
+        for _, _, task in self._ready + self._sleeping:
+            task.cancel()
+
+    # -- internals --
+    def _make_ready(self, task):
+        heapq.heappush(self._ready, (task.priority, next(self._seq), task))
+        if self._slice_job is None:
+            self._slice_job = self.root.after_idle(self._run_slice)
+
+    def _sleep(self, task, delay_ms):
+        task.wake_at = time.perf_counter() + delay_ms / 1000
+        heapq.heappush(self._sleeping, (task.wake_at, next(self._seq), task))
+        self._arm_timer()
+
+    def _arm_timer(self):
+        while self._sleeping and not self._sleeping[0][2].alive:
+            heapq.heappop(self._sleeping) # Drop cancelled sleepers
+        if not self._sleeping:
+            return
+        wake_at = self._sleeping[0][0]
+        if self._timer_job is not None and self._timer_at <= wake_at:
+            return # Already armed for an earlier (or the same) wake-up
+        if self._timer_job is not None:
+            self.root.after_cancel(self._timer_job)
+        delay = max(0, int((wake_at - time.perf_counter()) * 1000))
+        self._timer_at = wake_at
+        self._timer_job = self.root.after(delay, self._wake)
+
+    def _wake(self):
+        self._timer_job = None
+        now = time.perf_counter()
+        while self._sleeping and self._sleeping[0][0] <= now + 0.001:
+            _, _, task = heapq.heappop(self._sleeping)
+            if task.alive:
+                self._make_ready(task)
+        self._arm_timer()
+
+    def _run_slice(self):
+        self._slice_job = None
+        deadline = time.perf_counter() + self.slice_ms / 1000
+        while self._ready and time.perf_counter() < deadline:
+            _, _, task = heapq.heappop(self._ready)
+            if not task.alive:
+                continue
+            if self.monitor:
+                with self.monitor.watch(f"task:{task.name}"):
+                    self._step(task)
+            else:
+                self._step(task)
+        if self._ready and self._slice_job is None:
+            self._slice_job = self.root.after_idle(self._run_slice)
+
+    def _step(self, task):
+        try:
+            delay = next(task.gen)
+        except StopIteration as stop:
+            task.done = True
+            if task.on_done:
+                task.on_done(stop.value)
+            return
+        except Exception as e:
+            task.done = True
+            print(f"DEBUG: Task {task.name} failed: {e!r}")
+            return
+        if task.cancelled:
+            task.gen.close() # Cancelled itself (or its page) while running
+            return
+        if delay:
+            self._sleep(task, delay)
+        else:
+            heapq.heappush(self._ready, (task.priority, next(self._seq), task))
@@ -0,0 +1,297 @@
+"""
+Session record and replay.
+
+Recording: set ENAVROOM_TRACE=session.jsonl before starting the app. Every
+show_frame call, update_booking_details change and booking action (book,
+cancel, transition, clear_all) is appended to the trace with its start time
+and how long it took.
+
+Replay drives the same steps again as fast as possible and reports, step by
+step, how much slower or faster each one is than in the baseline (the
+recorded session, or a previous replay saved with --json):
+
+    python session_trace.py session.jsonl [--target app|system] [--runs N]
+                            [--json replay.json] [--baseline old.json] [--tolerance 0.25]
+
+--target app replays into a real App (under Xvfb when there is no display);
+--target system replays only the booking actions against a bare BookingSystem.
+A step made by another recorded step (a transition fired from show_frame, say)
+is replayed on its own only when its parent step is not replayed.
+Replays run in a scratch directory, so real bookings are never touched.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+TRACE_VERSION = 1
+BOOKING_ACTIONS = ("book", "cancel", "transition", "clear_all")
+
+
+def _plain(value):
+    """JSON-safe copy of call arguments and results (bookings become their IDs)."""
+    if hasattr(value, "id") and hasattr(value, "to_dict"):
+        return {"booking_id": value.id}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if callable(value):
+        return None # on_saved callbacks belong to the recorded session
+    return repr(value)
+
+
+class SessionRecorder:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        self.started = time.perf_counter()
+        self.seq = 0
+        self._stack = [] # (seq, kind) of the recorded calls currently running
+        self._write({"kind": "header", "version": TRACE_VERSION, "wall_time": time.time()})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def _wrap(self, owner, name, kind, describe):
+        original = getattr(owner, name)
+
+        def recorded(*args, **kwargs):
+            self.seq += 1
+            record = {"seq": self.seq, "kind": kind, "t": time.perf_counter() - self.started}
+            record.update(describe(*args, **kwargs))
+            if self._stack:
+                # Made by another recorded call; replayed only if that call isn't
+                record["nested"] = True
+                record["parent_seq"], record["parent_kind"] = self._stack[-1]
+            self._stack.append((record["seq"], kind))
+            start = time.perf_counter()
+            try:
+                result = original(*args, **kwargs)
+            finally:
+                self._stack.pop()
+                record["ms"] = (time.perf_counter() - start) * 1000
+            if kind == "booking":
+                record["result"] = _plain(result)
+            self._write(record)
+            return result
+        setattr(owner, name, recorded)
+
+    def attach(self, app):
+        """Starts recording an App (wraps this instance's methods only)."""
+        self._wrap(app, "show_frame", "show_frame", lambda page_name: {"page": page_name})
+        self._wrap(app, "update_booking_details", "details", lambda **kwargs: {"details": _plain(kwargs)})
+        self.attach_system(app.booking_system)
+
+    def attach_system(self, system):
+        for action in BOOKING_ACTIONS:
+            self._wrap(system, action, "booking",
+                       lambda *args, _action=action, **kwargs: {"action": _action, "args": _plain(args),
+                                                                "kwargs": _plain(kwargs)})
+
+    def close(self):
+        self.file.close()
+
+
+def load_trace(path):
+    steps = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("kind") == "header":
+                if record.get("version") != TRACE_VERSION:
+                    raise ValueError(f"Unsupported trace version {record.get('version')}")
+                continue
+            steps.append(record)
+    # Nested steps finish (and are written) before the step that made them
+    steps.sort(key=lambda step: step["seq"])
+    return steps
+
+
+def step_label(step):
+    if step["kind"] == "show_frame":
+        return f"show_frame:{step['page']}"
+    if step["kind"] == "booking":
+        return f"booking:{step['action']}"
+    return "details:" + ",".join(sorted(step["details"]))
+
+
+class Replayer:
+    def __init__(self, steps, target="system"):
+        self.steps = steps
+        self.target = target
+        self.ids = {} # Recorded booking ID -> ID of the booking made during this replay
+
+    def _map_ids(self, value):
+        if isinstance(value, str):
+            return self.ids.get(value, value)
+        if isinstance(value, list):
+            return [self._map_ids(v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._map_ids(v) for k, v in value.items()}
+        return value
+
+    def _booking(self, system, step):
+        args, kwargs = self._map_ids(step["args"]), self._map_ids(step.get("kwargs", {}))
+        try:
+            result = getattr(system, step["action"])(*args, **kwargs)
+        except (KeyError, ValueError) as e:
+            # The recorded session may have hit the same rejection; keep going
+            return f"rejected: {e}"
+        recorded = step.get("result")
+        if isinstance(recorded, dict) and "booking_id" in recorded and hasattr(result, "id"):
+            self.ids[recorded["booking_id"]] = result.id
+        return None
+
+    def _replays(self, step, replayed):
+        """Whether this target runs the step: its kind is replayed here and no replayed parent makes it again."""
+        if self.target == "system" and step["kind"] != "booking":
+            return False
+        if step.get("nested"):
+            if "parent_seq" not in step:
+                return False # Older traces: assume the parent makes the call
+            return step["parent_seq"] not in replayed
+        return True
+
+    def run(self, system=None, app=None, wait_idle=None):
+        """Replays every step once; returns [{seq, label, ms, idle_ms}, ...]."""
+        timings = []
+        replayed = set()
+        for step in self.steps: # Sorted by seq, so parents come before what they made
+            label = step_label(step)
+            if not self._replays(step, replayed):
+                continue
+            replayed.add(step["seq"])
+            idle_ms = None
+            start = time.perf_counter()
+            if self.target == "system":
+                note = self._booking(system, step)
+            else:
+                note = None
+                if step["kind"] == "show_frame":
+                    app.show_frame(step["page"])
+                elif step["kind"] == "details":
+                    app.update_booking_details(**self._map_ids(step["details"]))
+                else:
+                    note = self._booking(app.booking_system, step)
+            ms = (time.perf_counter() - start) * 1000
+            if app is not None and wait_idle:
+                wait_idle(app)
+                idle_ms = (time.perf_counter() - start) * 1000
+            timings.append({"seq": step["seq"], "label": label, "ms": ms, "idle_ms": idle_ms, "note": note})
+        return timings
+
+
+def replay(trace_path, target="system", runs=3):
+    """Replays a trace `runs` times in a scratch directory; returns per-step medians."""
+    steps = load_trace(trace_path)
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, here)
+    workdir = tempfile.mkdtemp(prefix="enavroom_replay_")
+    old_cwd = os.getcwd()
+    xvfb = None
+    all_runs = []
+    os.chdir(workdir)
+    try:
+        if target == "app":
+            from bench_ui import start_virtual_display, wait_idle
+            xvfb = start_virtual_display()
+            os.environ.pop("ENAVROOM_TRACE", None) # Don't record the replay itself
+            from gui import App
+            app = App()
+            wait_idle(app)
+            for _ in range(runs):
+                all_runs.append(Replayer(steps, "app").run(app=app, wait_idle=wait_idle))
+            app.writer.flush()
+            app.destroy()
+        else:
+            from bookingsystem import BookingSystem
+            for n in range(runs):
+                system = BookingSystem(f"bookings_{n}.json", f"booking_log_{n}.txt")
+                all_runs.append(Replayer(steps, "system").run(system=system))
+    finally:
+        os.chdir(old_cwd)
+        if xvfb:
+            xvfb.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = []
+    for per_step in zip(*all_runs):
+        first = per_step[0]
+        idle = [t["idle_ms"] for t in per_step if t["idle_ms"] is not None]
+        results.append({
+            "seq": first["seq"],
+            "label": first["label"],
+            "ms": statistics.median(t["ms"] for t in per_step),
+            "idle_ms": statistics.median(idle) if idle else None,
+            "note": first["note"],
+        })
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Adds baseline_ms / delta to each step; returns the steps slower than tolerance allows."""
+    base_by_seq = {step["seq"]: step["ms"] for step in baseline}
+    slower = []
+    for step in results:
+        base = base_by_seq.get(step["seq"])
+        step["baseline_ms"] = base
+        step["delta"] = (step["ms"] - base) / base if base else None
+        # Sub-millisecond steps are all noise; only flag steps that cost something
+        if step["delta"] is not None and step["delta"] > tolerance and step["ms"] - base > 1.0:
+            slower.append(step)
+    return slower
+
+
+def print_report(results):
+    print(f"{'seq':>5}  {'step':<40}{'replay ms':>10}{'base ms':>10}{'delta':>9}")
+    for step in results:
+        base = f"{step['baseline_ms']:.2f}" if step.get("baseline_ms") is not None else "-"
+        delta = f"{step['delta']:+.0%}" if step.get("delta") is not None else ""
+        note = f"  ({step['note']})" if step.get("note") else ""
+        print(f"{step['seq']:>5}  {step['label'][:39]:<40}{step['ms']:>10.2f}{base:>10}{delta:>9}{note}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded Enavroom session and compare step latencies.")
+    parser.add_argument("trace", help="Trace recorded with ENAVROOM_TRACE")
+    parser.add_argument("--target", choices=["app", "system"], default="system")
+    parser.add_argument("--runs", type=int, default=3, help="Replays per step (the median is reported)")
+    parser.add_argument("--json", help="Save this replay's results (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="Compare against a saved replay instead of the recorded timings")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown per step (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    trace = os.path.abspath(args.trace)
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    results = replay(trace, args.target, args.runs)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["steps"]
+    else:
+        baseline = [{"seq": step["seq"], "ms": step["ms"]} for step in load_trace(trace)]
+    slower = compare(results, baseline, args.tolerance)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"trace": trace, "target": args.target, "steps": results}, f, indent=2)
+    if slower:
+        print(f"\nREGRESSION: {len(slower)} step(s) slower than baseline by more than {args.tolerance:.0%}: "
+              + ", ".join(f"#{s['seq']} {s['label']}" for s in slower))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
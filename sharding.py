@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import zlib
+import random
+import itertools
+import threading
+import multiprocessing
+from concurrent.futures import Future
+
+from bookingsystem import Booking, BookingSystem, LOCATIONS, VEHICLE_SURCHARGES
+from analytics import BookingAnalytics
+
+# --- Sharded Booking System ---
+# Bookings are partitioned by pickup location across worker processes; each
+# worker owns a full BookingSystem (its own bookings file, delta log, audit
+# log and archive) under shards/shard_<n>/. Surge is tracked per pickup
+# location, so every surge counter lives entirely inside one shard.
+# ShardRouter sends each call to its shard over a pipe and returns a Future,
+# so calls for different shards run in parallel; history and stats queries
+# fan out to every shard and are merged.
+# Parallelism is bounded by the number of distinct pickup locations: a shard
+# count above that leaves some shards idle.
+
+SHARD_DIR = "shards"
+
+# Calls a shard will run, mapped to how their result is sent back
+_SHARD_METHODS = {
+    "book": "booking",
+    "cancel": "value",
+    "transition": "booking",
+    "quote": "value",
+    "eta": "value",
+    "find": "booking",
+    "history": "bookings",
+    "state_counts": "value",
+    "analytics_state": "value",
+}
+
+
+def shard_for(location, shard_count):
+    """Stable shard number for a pickup location (same in every process and run)."""
+    return zlib.crc32(location.encode("utf-8")) % shard_count
+
+
+def _run(system, method, args, kwargs):
+    if method not in _SHARD_METHODS:
+        raise AttributeError(f"Shards do not serve {method!r}")
+    if method == "analytics_state":
+        return system.analytics.to_state() # Raw aggregates, so the router can merge them
+    result = getattr(system, method)(*args, **kwargs)
+    kind = _SHARD_METHODS[method]
+    # Plain dicts cross the pipe; the router turns them back into Bookings
+    if kind == "booking":
+        return dict(result.to_dict()) if result else None
+    if kind == "bookings":
+        return [dict(b.to_dict()) for b in result]
+    return result
+
+
+def _shard_main(shard_id, data_dir, conn):
+    """Worker process loop: owns one BookingSystem and serves calls from the router."""
+    shard_dir = os.path.join(data_dir, f"shard_{shard_id}")
+    os.makedirs(shard_dir, exist_ok=True)
+    system = BookingSystem(
+        file=os.path.join(shard_dir, "bookings.json"),
+        log_file=os.path.join(shard_dir, "booking_log.txt"),
+        archive_dir=os.path.join(shard_dir, "booking_archive"),
+    )
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        request_id, method, args, kwargs = message
+        try:
+            conn.send((request_id, None, _run(system, method, args, kwargs)))
+        except Exception as e:
+            conn.send((request_id, e, None))
+    system.save() # Fold the delta log into a snapshot before exiting
+    conn.close()
+
+
+class _ShardClient:
+    """Router-side end of one shard: a pipe plus a reader thread resolving futures."""
+    def __init__(self, context, shard_id, data_dir):
+        self.shard_id = shard_id
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_shard_main, args=(shard_id, data_dir, child_conn),
+                                       name=f"booking-shard-{shard_id}", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self._pending = {}                  # request id -> Future; guarded by _send_lock
+        self._closed = False
+        self._ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_results, name=f"shard-{shard_id}-reader", daemon=True)
+        self._reader.start()
+
+    def call(self, method, *args, **kwargs):
+        future = Future()
+        with self._send_lock:
+            if self._closed:
+                raise RuntimeError(f"Booking shard {self.shard_id} stopped")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.conn.send((request_id, method, args, kwargs))
+        return future
+
+    def _read_results(self):
+        while True:
+            try:
+                request_id, error, result = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._send_lock:
+                future = self._pending.pop(request_id)
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        with self._send_lock:
+            # No call() can add to it after this; fail whatever is still waiting
+            self._closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(RuntimeError(f"Booking shard {self.shard_id} stopped"))
+
+    def close(self):
+        with self._send_lock:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass # Worker already gone
+        self.process.join()
+        self._reader.join()
+        self.conn.close()
+
+
+class ShardRouter:
+    def __init__(self, shard_count=None, data_dir=SHARD_DIR):
+        self.shard_count = shard_count or os.cpu_count() or 1
+        self.data_dir = data_dir
+        context = multiprocessing.get_context("spawn") # Same behaviour on Windows and Linux
+        self.shards = [_ShardClient(context, n, data_dir) for n in range(self.shard_count)]
+        self._owners = {} # booking_id -> shard, for bookings made through this router
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def shard(self, location):
+        return self.shards[shard_for(location, self.shard_count)]
+
+    # -- single-shard calls (return Futures) --
+    def book_async(self, vehicle_type, start, end, payment_method="Cash"):
+        client = self.shard(start)
+        future = client.call("book", vehicle_type, start, end, payment_method)
+
+        def remember_owner(done):
+            if not done.exception():
+                self._owners[done.result()["id"]] = client
+        future.add_done_callback(remember_owner)
+        return future
+
+    def quote_async(self, vehicle_type, start, end):
+        return self.shard(start).call("quote", vehicle_type, start, end)
+
+    # -- blocking conveniences --
+    def book(self, vehicle_type, start, end, payment_method="Cash"):
+        return Booking(**self.book_async(vehicle_type, start, end, payment_method).result())
+
+    def quote(self, vehicle_type, start, end):
+        return tuple(self.quote_async(vehicle_type, start, end).result())
+
+    def eta(self, vehicle_type, start, end, when=None):
+        """Trip minutes from the pickup's shard, which learns from the trips it completes."""
+        return self.shard(start).call("eta", vehicle_type, start, end, when).result()
+
+    def book_many(self, requests):
+        """Books (vehicle_type, start, end, payment_method) tuples across shards in parallel."""
+        futures = [self.book_async(*request) for request in requests]
+        return [Booking(**f.result()) for f in futures]
+
+    def _owner_call(self, method, booking_id, *args):
+        """Runs a call on the shard owning booking_id, asking every shard if the owner is unknown."""
+        client = self._owners.get(booking_id)
+        if client is not None:
+            return client.call(method, booking_id, *args).result()
+        futures = [(c, c.call("find", booking_id)) for c in self.shards]
+        for c, future in futures:
+            if future.result() is not None:
+                self._owners[booking_id] = c
+                return c.call(method, booking_id, *args).result()
+        return None
+
+    def cancel(self, booking_id):
+        return bool(self._owner_call("cancel", booking_id))
+
+    def transition(self, booking_id, new_status):
+        result = self._owner_call("transition", booking_id, new_status)
+        if result is None:
+            raise KeyError(f"No active booking {booking_id}")
+        return Booking(**result)
+
+    def find(self, booking_id):
+        result = self._owner_call("find", booking_id)
+        return Booking(**result) if result else None
+
+    # -- fan-out queries --
+    def _fan_out(self, method, *args):
+        futures = [c.call(method, *args) for c in self.shards]
+        return [f.result() for f in futures]
+
+    def history(self, since=None):
+        """Bookings from every shard, oldest first."""
+        rows = [row for shard_rows in self._fan_out("history", since) for row in shard_rows]
+        rows.sort(key=lambda row: (row.get("created_at") or 0, row["id"]))
+        return [Booking(**row) for row in rows]
+
+    def state_counts(self):
+        totals = {}
+        for counts in self._fan_out("state_counts"):
+            for state, count in counts.items():
+                totals[state] = totals.get(state, 0) + count
+        return totals
+
+    def analytics(self):
+        """BookingAnalytics over every shard: each shard's raw aggregates, merged."""
+        merged = BookingAnalytics()
+        for state in self._fan_out("analytics_state"):
+            merged.merge(BookingAnalytics.from_state(state))
+        return merged
+
+    def analytics_summary(self):
+        return self.analytics().summary()
+
+    def close(self):
+        for client in self.shards:
+            client.close()
+
+
+if __name__ == "__main__":
+    # Usage: python sharding.py [bookings] [shards]  -> booking throughput with 1 vs N shards
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    counts = [1, int(sys.argv[2])] if len(sys.argv) > 2 else [1, os.cpu_count() or 1]
+    rng = random.Random(7)
+    requests = []
+    for _ in range(total):
+        start, end = rng.sample(LOCATIONS, 2)
+        requests.append((rng.choice(list(VEHICLE_SURCHARGES)), start, end, "Cash"))
+    for shard_count in counts:
+        with ShardRouter(shard_count, data_dir=os.path.join(SHARD_DIR, f"bench_{shard_count}")) as router:
+            started = time.perf_counter()
+            router.book_many(requests)
+            elapsed = time.perf_counter() - started
+            print(f"{shard_count} shard(s): {total} bookings in {elapsed:.2f}s "
+                  f"({total / elapsed:.0f}/s), states {router.state_counts()}")
@@ -0,0 +1,152 @@
+import time
+import json
+import heapq
+import tkinter
+from collections import deque
+from contextlib import contextmanager
+
+# --- Event-Loop Stall Monitor ---
+# A short after() heartbeat measures how late Tk gets back to us. Every Tk
+# callback is also timed (see install_callback_tracing), so when the heartbeat
+# is late we know which handler / page held the loop.
+
+class StallMonitor:
+    def __init__(self, root, interval_ms=20, threshold_ms=100, capacity=20):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.capacity = capacity
+        self.page = None              # Page currently on screen (set by App.show_frame)
+        self.beats = 0
+        self.max_lag_ms = 0.0
+        self._worst = []              # min-heap of (lag_ms, seq, record), at most `capacity`
+        self._recent = deque(maxlen=capacity)
+        self._seq = 0
+        self._active = []             # Stack of [label, slowest child, child ms] being timed
+        self._slowest = None          # (duration_ms, label) slowest callback since last beat
+        self._expected = None
+        self._after_id = None
+
+    # -- heartbeat --
+    def start(self):
+        if self._after_id is None:
+            self._expected = time.perf_counter() + self.interval_ms / 1000
+            self._after_id = self.root.after(self.interval_ms, self._beat)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._expected) * 1000)
+        self.beats += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms >= self.threshold_ms:
+            culprit = self._slowest[1] if self._slowest else "unattributed"
+            callback_ms = self._slowest[0] if self._slowest else 0.0
+            self._record(lag_ms, culprit, callback_ms)
+        self._slowest = None
+        self._expected = now + self.interval_ms / 1000
+        self._after_id = self.root.after(self.interval_ms, self._beat)
+
+    # -- attribution --
+    @contextmanager
+    def watch(self, label):
+        """Times a block of work so stalls it causes are attributed to `label`."""
+        frame = [label, None, 0.0]    # label, slowest nested label, its duration
+        self._active.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self._active.pop()
+            if frame[1]:
+                label = f"{label} > {frame[1]}"
+            if self._active:
+                # Nested work: let the enclosing callback name it as its slowest part
+                parent = self._active[-1]
+                if duration_ms > parent[2]:
+                    parent[1], parent[2] = label, duration_ms
+            elif self._slowest is None or duration_ms > self._slowest[0]:
+                self._slowest = (duration_ms, label)
+
+    def _record(self, lag_ms, culprit, callback_ms):
+        self._seq += 1
+        record = {
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "lag_ms": round(lag_ms, 1),
+            "callback": culprit,
+            "callback_ms": round(callback_ms, 1),
+            "page": self.page,
+        }
+        self._recent.append(record)
+        if len(self._worst) < self.capacity:
+            heapq.heappush(self._worst, (lag_ms, self._seq, record))
+        elif lag_ms > self._worst[0][0]:
+            heapq.heapreplace(self._worst, (lag_ms, self._seq, record))
+        print(f"DEBUG: Event loop stalled {lag_ms:.0f} ms in {culprit} (page: {self.page})")
+
+    # -- reporting --
+    def worst(self):
+        return [record for _, _, record in sorted(self._worst, reverse=True)]
+
+    def recent(self):
+        return list(self._recent)
+
+    def report(self):
+        lines = [f"Stall monitor: {self.beats} beats, max lag {self.max_lag_ms:.0f} ms, "
+                 f"threshold {self.threshold_ms} ms"]
+        for record in self.worst():
+            lines.append(f"  {record['lag_ms']:>8.1f} ms  {record['callback']} "
+                         f"({record['callback_ms']:.1f} ms) on {record['page']} at {record['at']}")
+        return "\n".join(lines)
+
+    def dump(self, path="stall_report.json"):
+        """Prints the worst stalls and writes them (plus the recent ones) to a JSON file."""
+        print(self.report())
+        with open(path, "w") as f:
+            json.dump({"beats": self.beats, "max_lag_ms": self.max_lag_ms,
+                       "worst": self.worst(), "recent": self.recent()}, f, indent=2)
+        return path
+
+
+_ORIGINAL_CALL_WRAPPER = tkinter.CallWrapper
+
+
+def _unwrap(func):
+    # after() wraps callbacks in a local `callit` closure; dig the real one out
+    if getattr(func, "__qualname__", "").endswith("after.<locals>.callit"):
+        for cell in func.__closure__ or ():
+            inner = cell.cell_contents
+            if callable(inner) and getattr(inner, "__name__", None) == func.__name__:
+                return inner
+    return func
+
+
+def _callback_label(func):
+    func = _unwrap(func)
+    owner = getattr(func, "__self__", None)
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__", repr(func))
+    if owner is not None and "." not in name:
+        name = f"{type(owner).__name__}.{name}"
+    return name
+
+
+def install_callback_tracing(monitor):
+    """
+    Routes every Tk callback registered from now on (commands, bindings, after())
+    through monitor.watch(), so stalls are attributed to the handler that ran.
+    """
+    base = _ORIGINAL_CALL_WRAPPER
+
+    class WatchedCallWrapper(base):
+        def __call__(self, *args):
+            if _unwrap(self.func) == monitor._beat:
+                return base.__call__(self, *args)
+            with monitor.watch(_callback_label(self.func)):
+                return base.__call__(self, *args)
+
+    tkinter.CallWrapper = WatchedCallWrapper
@@ -0,0 +1,163 @@
+import os
+import sys
+import gzip
+import json
+import time
+from datetime import datetime, timedelta
+
+from analytics import BookingAnalytics
+from booking_ids import id_timestamp
+
+# --- Partitioned Booking Archive ---
+# Closed bookings (cancelled, later completed) move out of bookings.json into
+# one gzip-compressed JSON Lines segment per day, named after the day the
+# booking was created. Segments are only ever appended to (each archive run
+# adds a new gzip member), never rewritten. A small manifest records which
+# days exist, how many bookings each holds and the analytics totals of
+# everything archived, so queries open only the days they cover and startup
+# never reads the archive at all.
+
+ARCHIVE_DIR = "booking_archive"
+MANIFEST_FILE = "manifest.json"
+UNDATED = "undated"            # Bookings with old 8-char IDs and no created_at
+SEGMENT_CACHE_SIZE = 32        # Parsed segments kept in memory: the GUI's 30-day history plus today and undated
+
+
+def partition_for(booking):
+    created_at = booking.get("created_at") or id_timestamp(booking.get("id"))
+    if created_at is None:
+        return UNDATED
+    return datetime.fromtimestamp(created_at).strftime("%Y-%m-%d")
+
+
+class BookingArchive:
+    def __init__(self, root_dir=ARCHIVE_DIR):
+        self.root_dir = root_dir
+        self.manifest_path = os.path.join(root_dir, MANIFEST_FILE)
+        self.partitions = {}   # day -> number of bookings in its segment
+        self.analytics = BookingAnalytics()  # Totals over everything archived
+        self._segments = {}    # day -> (file size, [booking dicts]), most recently used last
+        self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.partitions = manifest.get("partitions", {})
+            self.analytics = BookingAnalytics.from_state(manifest.get("analytics"))
+        except (OSError, ValueError):
+            self.partitions = {}
+            self.analytics = BookingAnalytics()
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"partitions": self.partitions, "analytics": self.analytics.to_state()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def segment_path(self, day):
+        return os.path.join(self.root_dir, f"{day}.jsonl.gz")
+
+    def __len__(self):
+        return sum(self.partitions.values())
+
+    # -- writing --
+    def archive(self, bookings):
+        """Appends booking dicts to their day segments. Returns how many were written."""
+        by_day = {}
+        for booking in bookings:
+            by_day.setdefault(partition_for(booking), []).append(booking)
+        if not by_day:
+            return 0
+        os.makedirs(self.root_dir, exist_ok=True)
+        for day, rows in by_day.items():
+            payload = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+            with open(self.segment_path(day), "ab") as f:
+                f.write(gzip.compress(payload.encode("utf-8")))
+                f.flush()
+                os.fsync(f.fileno())
+            self.partitions[day] = self.partitions.get(day, 0) + len(rows)
+            self._segments.pop(day, None)
+        self.analytics.merge(BookingAnalytics.from_bookings(bookings))
+        self._save_manifest()
+        return len(bookings)
+
+    def clear(self):
+        for day in list(self.partitions):
+            try:
+                os.remove(self.segment_path(day))
+            except OSError:
+                pass
+        self.partitions = {}
+        self.analytics = BookingAnalytics()
+        self._segments = {}
+        if os.path.isdir(self.root_dir):
+            self._save_manifest()
+
+    # -- reading --
+    def _read_segment(self, day):
+        path = self.segment_path(day)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return []
+        cached = self._segments.pop(day, None)
+        if cached and cached[0] == size:
+            self._segments[day] = cached
+            return cached[1]
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        self._segments[day] = (size, rows)
+        if len(self._segments) > SEGMENT_CACHE_SIZE:
+            del self._segments[next(iter(self._segments))]
+        return rows
+
+    def days_between(self, start_time=None, end_time=None):
+        """Archived days overlapping [start_time, end_time] (unix times), oldest first."""
+        first = datetime.fromtimestamp(start_time).strftime("%Y-%m-%d") if start_time else ""
+        last = datetime.fromtimestamp(end_time).strftime("%Y-%m-%d") if end_time else "9999-99-99"
+        return sorted(day for day in self.partitions if day != UNDATED and first <= day <= last)
+
+    def query(self, start_time=None, end_time=None, include_undated=False):
+        """Yields archived booking dicts created in a time range, opening only the days it covers."""
+        for day in self.days_between(start_time, end_time):
+            for row in self._read_segment(day):
+                created_at = row.get("created_at") or id_timestamp(row.get("id"))
+                if start_time and created_at < start_time:
+                    continue
+                if end_time and created_at > end_time:
+                    continue
+                yield row
+        if include_undated and UNDATED in self.partitions:
+            yield from self._read_segment(UNDATED)
+
+    def get(self, booking_id):
+        """An archived booking by ID; new-style IDs open just their own day."""
+        created_at = id_timestamp(booking_id)
+        days = [partition_for({"id": booking_id})] if created_at else sorted(self.partitions)
+        for day in days:
+            if day not in self.partitions:
+                continue
+            for row in self._read_segment(day):
+                if row.get("id") == booking_id:
+                    return row
+        return None
+
+    def iter_all(self):
+        for day in sorted(self.partitions):
+            yield from self._read_segment(day)
+
+
+if __name__ == "__main__":
+    # Usage: python storage.py [days]  -> archived bookings from the last N days (default 7)
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    archive = BookingArchive()
+    since = (datetime.now() - timedelta(days=days)).timestamp()
+    start = time.perf_counter()
+    rows = list(archive.query(since))
+    for row in rows:
+        print(json.dumps(row, ensure_ascii=False))
+    print(f"{len(rows)} of {len(archive)} archived bookings from {len(archive.days_between(since))} "
+          f"partitions in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
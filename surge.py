@@ -0,0 +1,99 @@
+import time
+
+# --- Surge Pricing ---
+# Demand and supply are counted per location over a rolling window. Each
+# location keeps a small ring of time buckets plus a running total, so
+# recording an event or reading the multiplier never rescans bookings.
+
+class RollingCounter:
+    """Per-key counts over a sliding time window, stored as ring buffers of buckets."""
+    def __init__(self, window_seconds=900, bucket_seconds=60):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = max(1, window_seconds // bucket_seconds)
+        self._state = {}  # key -> [bucket counts, newest bucket number, running total]
+
+    def _advance(self, key, now):
+        bucket = int(now // self.bucket_seconds)
+        state = self._state.get(key)
+        if state is None:
+            state = [[0] * self.n_buckets, bucket, 0]
+            self._state[key] = state
+            return state
+        counts, last_bucket, total = state
+        if bucket - last_bucket >= self.n_buckets:
+            # Everything in the ring has expired
+            state[0] = [0] * self.n_buckets
+            state[2] = 0
+        else:
+            # Expire only the buckets we moved past (at most n_buckets steps)
+            for b in range(last_bucket + 1, bucket + 1):
+                i = b % self.n_buckets
+                total -= counts[i]
+                counts[i] = 0
+            state[2] = total
+        state[1] = max(bucket, last_bucket)
+        return state
+
+    def add(self, key, amount=1, now=None):
+        now = time.time() if now is None else now
+        state = self._advance(key, now)
+        state[0][int(now // self.bucket_seconds) % self.n_buckets] += amount
+        state[2] += amount
+
+    def retract(self, key, amount, at, now=None):
+        """Takes back `amount` counted at time `at`, if that bucket is still in the window."""
+        now = time.time() if now is None else now
+        if key not in self._state:
+            return False
+        state = self._advance(key, now)
+        bucket = int(at // self.bucket_seconds)
+        if not 0 <= state[1] - bucket < self.n_buckets:
+            return False # Already expired (or from the future): nothing left to take back
+        state[0][bucket % self.n_buckets] -= amount
+        state[2] -= amount
+        return True
+
+    def total(self, key, now=None):
+        if key not in self._state:
+            return 0
+        now = time.time() if now is None else now
+        return self._advance(key, now)[2]
+
+
+class SurgeTracker:
+    """
+    Turns rolling demand (bookings minus cancellations) and supply (available
+    drivers) at a pickup location into a fare multiplier.
+    """
+    def __init__(self, window_seconds=900, bucket_seconds=60, baseline_supply=10,
+                 sensitivity=0.5, max_multiplier=2.0, step=0.1):
+        self.demand = RollingCounter(window_seconds, bucket_seconds)
+        self.supply = RollingCounter(window_seconds, bucket_seconds)
+        self.baseline_supply = baseline_supply  # Drivers assumed around each location
+        self.sensitivity = sensitivity
+        self.max_multiplier = max_multiplier
+        self.step = step                        # Multipliers move in steps so quotes stay cacheable
+
+    def record_booking(self, location, now=None):
+        self.demand.add(location, 1, now)
+
+    def record_cancel(self, location, booked_at, now=None):
+        """Takes a cancelled booking out of demand, if the time it was booked is still in the window."""
+        if booked_at is not None:
+            self.demand.retract(location, 1, booked_at, now)
+
+    def record_supply(self, location, drivers=1, now=None):
+        """Reports drivers becoming available (positive) or busy (negative) at a location."""
+        self.supply.add(location, drivers, now)
+
+    def multiplier(self, location, now=None):
+        demand = max(self.demand.total(location, now), 0)
+        if demand == 0:
+            return 1.0
+        supply = max(self.baseline_supply + self.supply.total(location, now), 1)
+        ratio = demand / supply
+        if ratio <= 1:
+            return 1.0
+        surge = min(1 + (ratio - 1) * self.sensitivity, self.max_multiplier)
+        # Round down to the step so tiny changes in demand don't move the fare
+        return round(int(surge / self.step + 1e-9) * self.step, 2)
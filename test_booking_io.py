@@ -0,0 +1,33 @@
+from bookingsystem import BookingSystem
+from booking_io import import_bookings, iter_log_bookings
+from lifecycle import MATCHED, EN_ROUTE, COMPLETED, CANCELLED
+
+
+def _source(tmp_path):
+    source = BookingSystem(str(tmp_path / "source.json"), str(tmp_path / "source_log.txt"))
+    done = source.book("Enavroom-vroom", "PUP Main", "CEA")
+    for status in (MATCHED, EN_ROUTE, COMPLETED):
+        source.transition(done.id, status)
+    cancelled = source.book("Car (4-seater)", "CEA", "Hasmin")
+    source.cancel(cancelled.id)
+    open_booking = source.book("Car (6-seater)", "Hasmin", "PUP Main")
+    source.transition(open_booking.id, MATCHED)
+    return source, done, cancelled, open_booking
+
+
+def test_log_lines_merge_into_one_booking_each(tmp_path):
+    source, done, cancelled, open_booking = _source(tmp_path)
+    errors = []
+    records = list(iter_log_bookings(source.log_file, errors))
+    assert errors == []
+    assert [(r["id"], r["status"]) for r in records] == [
+        (done.id, COMPLETED), (cancelled.id, CANCELLED), (open_booking.id, MATCHED)]
+
+
+def test_log_import_keeps_final_statuses(tmp_path):
+    source, done, cancelled, open_booking = _source(tmp_path)
+    target = BookingSystem(str(tmp_path / "target.json"), str(tmp_path / "target_log.txt"))
+    errors = []
+    assert import_bookings(target, source.log_file, errors=errors) == (3, 0), errors
+    for booking, status in ((done, COMPLETED), (cancelled, CANCELLED), (open_booking, MATCHED)):
+        assert target.find(booking.id).status == status
@@ -0,0 +1,106 @@
+import math
+import time
+import random
+from collections import deque
+
+# --- Live Driver Tracking ---
+# A simulated GPS feed reports the driver's position about once a second, the
+# way a real phone would. The map is drawn a frame at a time (FRAME_MS), so
+# positions in between fixes are interpolated: the sprite is shown one fix
+# interval in the past and slides linearly between the two fixes around that
+# moment, which keeps the motion smooth even though the fixes are coarse.
+# Nothing here touches Tk; the page just moves its canvas items to project().
+
+FRAME_MS = 50              # ~20 fps is plenty for a sprite crossing a small map
+FIX_INTERVAL_S = 1.0       # How often the (simulated) driver phone reports in
+GPS_JITTER_M = 4.0         # Typical phone GPS noise
+METERS_PER_DEGREE = 111320
+
+
+class SimulatedGPSFeed:
+    """Fixes along a straight route from start to end (lat, lon pairs), easing in and out at the ends."""
+    def __init__(self, start, end, duration_s, fix_interval_s=FIX_INTERVAL_S, jitter_m=GPS_JITTER_M,
+                 seed=None, clock=time.monotonic):
+        self.start = start
+        self.end = end
+        self.duration_s = max(duration_s, fix_interval_s)
+        self.fix_interval_s = fix_interval_s
+        self.jitter_m = jitter_m
+        self.clock = clock
+        self.started = clock()
+        self.fix_count = math.ceil(self.duration_s / fix_interval_s) # Fixes after the one at t=0
+        self._next_fix = 0
+        self._rng = random.Random(seed)
+
+    def elapsed(self):
+        return self.clock() - self.started
+
+    def position_at(self, fraction):
+        eased = fraction * fraction * (3 - 2 * fraction) # Pull away and stop smoothly
+        return (self.start[0] + (self.end[0] - self.start[0]) * eased,
+                self.start[1] + (self.end[1] - self.start[1]) * eased)
+
+    def poll(self):
+        """Fixes reported since the last poll, as [(t, lat, lon), ...] with t in seconds from the start."""
+        now = self.elapsed()
+        fixes = []
+        while self._next_fix <= self.fix_count and self._next_fix * self.fix_interval_s <= now:
+            t = self._next_fix * self.fix_interval_s
+            fraction = min(1.0, t / self.duration_s)
+            lat, lon = self.position_at(fraction)
+            if 0 < fraction < 1: # Pickup and drop-off fixes are exact
+                lat += self._rng.gauss(0, self.jitter_m / METERS_PER_DEGREE)
+                lon += self._rng.gauss(0, self.jitter_m / (METERS_PER_DEGREE * math.cos(math.radians(lat))))
+            fixes.append((t, lat, lon))
+            self._next_fix += 1
+        return fixes
+
+    @property
+    def finished(self):
+        return self._next_fix > self.fix_count
+
+
+class TrackInterpolator:
+    """Smoothed position between GPS fixes, rendered `delay_s` behind the clock."""
+    def __init__(self, delay_s=FIX_INTERVAL_S):
+        self.delay_s = delay_s
+        self.fixes = deque(maxlen=4) # Only the fixes around the render time are ever needed
+
+    def push(self, t, lat, lon):
+        self.fixes.append((t, lat, lon))
+
+    def position(self, now):
+        """(lat, lon) to show at `now`, or None before the first fix."""
+        if not self.fixes:
+            return None
+        t = now - self.delay_s
+        if t <= self.fixes[0][0]:
+            return self.fixes[0][1:]
+        for (t0, lat0, lon0), (t1, lat1, lon1) in zip(self.fixes, list(self.fixes)[1:]):
+            if t <= t1:
+                f = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+                return (lat0 + (lat1 - lat0) * f, lon0 + (lon1 - lon0) * f)
+        return self.fixes[-1][1:] # Waiting for the next fix: hold the last one
+
+    def caught_up(self, now):
+        """True once the render time has reached the newest fix."""
+        return bool(self.fixes) and now - self.delay_s >= self.fixes[-1][0]
+
+
+class CanvasProjection:
+    """Maps (lat, lon) onto a width x height canvas so that `points` fit inside `margin` pixels."""
+    def __init__(self, points, width, height, margin=24):
+        lats = [p[0] for p in points]
+        lons = [p[1] for p in points]
+        self.center = ((min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2)
+        self.lon_scale = math.cos(math.radians(self.center[0])) # Keep east-west distances true
+        span_x = max((max(lons) - min(lons)) * self.lon_scale, 1e-4)
+        span_y = max(max(lats) - min(lats), 1e-4)
+        self.scale = min((width - 2 * margin) / span_x, (height - 2 * margin) / span_y)
+        self.width = width
+        self.height = height
+
+    def project(self, lat, lon):
+        x = self.width / 2 + (lon - self.center[1]) * self.lon_scale * self.scale
+        y = self.height / 2 - (lat - self.center[0]) * self.scale
+        return (x, y)